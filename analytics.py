@@ -0,0 +1,160 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+import config
+import schema
+
+PART_COLUMNS = ["part1", "part2", "part3", "part4"]
+KEYS = ["part", "number", "code"]
+
+
+def load(conn, parts=None):
+    """读取测量值, parts 为 None 时读取全表"""
+    sql = (
+        "select part, number, code, stage, file_hash, upper_tolerance, "
+        f"lower_tolerance, {', '.join(PART_COLUMNS)} from measurement"
+    )
+    params = ()
+    if parts is not None:
+        sql += f" where part in ({', '.join('?' * len(parts))})"
+        params = tuple(parts)
+    result = conn.exec_driver_sql(sql, params)
+    df = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+    numeric = ["upper_tolerance", "lower_tolerance"] + PART_COLUMNS
+    # 旧数据中可能混有文本, 无法转换的按未测量处理
+    df[numeric] = df[numeric].apply(pd.to_numeric, errors="coerce")
+    return df
+
+
+def conformance(df):
+    """按 (stage, file_hash) 统计, 每个特性的所有测量值都在公差内才算合格
+
+    返回列: measured, out_of_tolerance, conformance, value_conformance
+    """
+    values = df[PART_COLUMNS].to_numpy(dtype=float)
+    upper = df["upper_tolerance"].to_numpy(dtype=float)
+    lower = df["lower_tolerance"].to_numpy(dtype=float)
+    # 只有一侧公差时另一侧不限
+    toleranced = ~(np.isnan(upper) & np.isnan(lower))
+    upper = np.where(np.isnan(upper), np.inf, upper)[:, None]
+    lower = np.where(np.isnan(lower), -np.inf, lower)[:, None]
+
+    measured = ~np.isnan(values) & toleranced[:, None]
+    inside = (values <= upper) & (values >= lower)
+    out = measured & ~inside
+    rows = pd.DataFrame(
+        {
+            "stage": df["stage"].to_numpy(),
+            "file_hash": df["file_hash"].to_numpy(),
+            "measured": measured.any(axis=1),
+            "ok": measured.any(axis=1) & ~out.any(axis=1),
+            "values": measured.sum(axis=1),
+            "out_of_tolerance": out.sum(axis=1),
+        }
+    )
+    result = rows.groupby(["stage", "file_hash"]).sum()
+    # 没有可判定的测量值时合格率为空
+    measured_rows = result["measured"].where(result["measured"] > 0)
+    measured_values = result["values"].where(result["values"] > 0)
+    result["conformance"] = result["ok"] / measured_rows
+    result["value_conformance"] = 1 - result["out_of_tolerance"] / measured_values
+    return result[schema.ANALYTICS_COLUMNS[:4]]
+
+
+def drift(df, stage_list=None):
+    """按 (part, stage) 统计相对上一个有数据阶段的平均偏移 (各特性均值之差的绝对值)"""
+    stage_list = stage_list or schema.stages()
+    values = df[PART_COLUMNS].to_numpy(dtype=float)
+    counts = (~np.isnan(values)).sum(axis=1)
+    means = df.assign(mean=np.nansum(values, axis=1) / np.where(counts, counts, np.nan))
+    table = means.groupby(KEYS + ["stage"])["mean"].mean().unstack("stage")
+    table = table.reindex(columns=[s for s in stage_list if s in table.columns])
+    # 每个特性与其最近的前一阶段比较
+    previous = table.ffill(axis=1).shift(axis=1)
+    shift = (table - previous).abs()
+    # 没有可比较的前一阶段时为空, 写入 NULL 以覆盖旧值
+    return (
+        shift.groupby(level="part")
+        .mean()
+        .reset_index()
+        .melt(id_vars="part", var_name="stage", value_name="drift")
+    )
+
+
+def cross_check(conn, file_hashes=None):
+    """与卡片上的 icmd/icmc 比较, 返回差值超出 ANALYTICS_CHECK_TOLERANCE 的文件"""
+    sql = (
+        "select number, stage, file, icmd, icmc, conformance, value_conformance, "
+        "icmd_delta, icmc_delta from Total "
+        "where (abs(icmd_delta) > ? or abs(icmc_delta) > ?)"
+    )
+    params = (config.ANALYTICS_CHECK_TOLERANCE,) * 2
+    if file_hashes is not None:
+        sql += f" and file_hash in ({', '.join('?' * len(file_hashes))})"
+        params += tuple(file_hashes)
+    return conn.exec_driver_sql(sql, params).fetchall()
+
+
+def analyze(conn, parts=None):
+    """计算并写入 Total 的分析列, parts 为 None 时处理全部零件"""
+    df = load(conn, parts)
+    if df.empty:
+        return 0
+    stats = conformance(df).reset_index()
+    conn.execute(
+        text(
+            "update Total set measured = :measured, "
+            "out_of_tolerance = :out_of_tolerance, conformance = :conformance, "
+            "value_conformance = :value_conformance, "
+            "icmd_delta = :conformance - icmd, "
+            "icmc_delta = :value_conformance - icmc "
+            "where stage = :stage and file_hash = :file_hash"
+        ),
+        records(stats),
+    )
+    drifts = drift(df)
+    if not drifts.empty:
+        conn.execute(
+            text(
+                "update Total set drift = :drift "
+                "where number = :part and stage = :stage"
+            ),
+            records(drifts),
+        )
+    return len(stats)
+
+
+def records(df):
+    # NaN 写入为 NULL, numpy 数值转换为 Python 类型
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def stage_summary(conn):
+    """各阶段汇总: 文件数, 特性数, 超差值数, 平均合格率, 平均偏移"""
+    result = conn.execute(
+        text(
+            "select stage, count(*) as files, sum(measured) as measured, "
+            "sum(out_of_tolerance) as out_of_tolerance, "
+            "avg(conformance) as conformance, avg(drift) as drift "
+            "from Total group by stage"
+        )
+    )
+    rows = {row.stage: row for row in result}
+    return [rows[s] for s in schema.stages() if s in rows]
+
+
+def refresh(conn, batch_parts=None):
+    """按零件分批重算全表, 内存占用与批大小有关而与总行数无关"""
+    batch_parts = batch_parts or config.ANALYTICS_BATCH_PARTS
+    result = conn.execute(text("select distinct part from measurement order by part"))
+    parts = [row[0] for row in result]
+    files = 0
+    for i in range(0, len(parts), batch_parts):
+        files += analyze(conn, parts[i : i + batch_parts])
+    mismatched = cross_check(conn)
+    if mismatched:
+        logging.warning(f"{len(mismatched)} 个文件的计算合格率与卡片 icmd/icmc 不一致")
+    return files, mismatched
@@ -0,0 +1,131 @@
+"""生成与 88 卡/32 卡布局一致的合成报告, 用于性能测试
+
+    python -m bench.make_corpus bench/corpus --files 200 --sheets 20
+"""
+import argparse
+import io
+import random
+from pathlib import Path
+
+from layouts import LAYOUTS
+from workbook import cell_ref, parse_cols
+
+LAYOUT_88, LAYOUT_32 = LAYOUTS
+
+
+def block_sheet_name(layout, k):
+    block = layout.block
+    if block.suffix:
+        return f"{block.prefix}{k + 2}{block.suffix}"
+    return f"{block.prefix}{k + 1}"
+
+
+def measurement_row(i, sheet_no):
+    upper = round(random.uniform(0.1, 1.0), 2)
+    parts = [round(random.uniform(-1.2, 1.2) * upper, 3) for _ in range(4)]
+    return ["D", f"N{sheet_no:03d}", f"C{i:03d}", upper, -upper] + parts
+
+
+def build_cells(layout, sheets, rows, part, title, noise=True):
+    """返回 {sheet: {(row, col): value}}, noise 时在测量区域右侧填充无关数据"""
+    header = {"number": part, "title": title, "icmd": 0.9, "icmc": 0.85}
+    if layout is LAYOUT_32:
+        # 32 卡零件号带空格, 解析时去除
+        header["number"] = f"{part[:4]} {part[4:]}"
+    book = {sheet: {} for sheet in layout.signature}
+    for f in layout.header:
+        book[f.sheet][cell_ref(f.ref.split(":")[-1])] = header[f.name]
+
+    block = layout.block
+    cols = parse_cols(block.usecols)
+    for k in range(sheets):
+        cells = book[block_sheet_name(layout, k)] = {}
+        for i in range(min(rows, block.nrows)):
+            r = block.skiprows + i
+            for c, v in zip(cols, measurement_row(i, k)):
+                cells[(r, c)] = v
+            if noise:
+                for c in range(max(cols) + 1, max(cols) + 11):
+                    cells[(r, c)] = random.random()
+    return book
+
+
+def save_xlsx(book):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    wb.remove(wb.active)
+    for sheet, cells in book.items():
+        ws = wb.create_sheet(sheet)
+        for (r, c), v in cells.items():
+            ws.cell(r + 1, c + 1, v)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def save_xls(book):
+    import xlwt  # 仅生成 .xls 时需要
+
+    wb = xlwt.Workbook()
+    for sheet, cells in book.items():
+        ws = wb.add_sheet(sheet)
+        for (r, c), v in cells.items():
+            ws.write(r, c, v)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def encrypt(data, password="VelvetSweatshop"):
+    # msoffcrypto 只支持加密 OOXML 格式
+    from msoffcrypto.format.ooxml import OOXMLFile
+
+    out = io.BytesIO()
+    OOXMLFile(io.BytesIO(data)).encrypt(password, out)
+    return out.getvalue()
+
+
+def make_corpus(out, files, sheets, rows=40, encrypted=0.2, fmt="xlsx", seed=0):
+    random.seed(seed)
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for n in range(files):
+        layout = LAYOUT_88 if n % 2 == 0 else LAYOUT_32
+        title = f"synthetic-{layout.name}-{n:05d}"
+        book = build_cells(layout, sheets, rows, f"K{300000000 + n}", title)
+        data = save_xls(book) if fmt == "xls" else save_xlsx(book)
+        if fmt == "xlsx" and layout is LAYOUT_32 and random.random() < encrypted:
+            data = encrypt(data)
+            title += "-enc"
+        path = out / f"{title}.{fmt}"
+        path.write_bytes(data)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--sheets", type=int, default=10, help="每个文件的 RES-/(32i) 表数")
+    parser.add_argument("--rows", type=int, default=40, help="每个表的测量行数")
+    parser.add_argument("--encrypted", type=float, default=0.2, help="加密 32 卡的比例")
+    parser.add_argument("--format", default="xlsx", choices=["xlsx", "xls"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    paths = make_corpus(
+        args.out,
+        args.files,
+        args.sheets,
+        args.rows,
+        args.encrypted,
+        args.format,
+        args.seed,
+    )
+    print(f"{len(paths)} 个文件已生成: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""导入性能测试: 分阶段计时 (open/parse/transform/csv/db), 吞吐量和峰值内存
+
+    python -m bench.make_corpus bench/corpus --files 200 --sheets 20
+    python -m bench.run_bench bench/corpus
+    python -m bench.run_bench bench/corpus --end-to-end --workers 4
+    python -m bench.run_bench bench/corpus --backend calamine
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import config
+import manifest
+import schema
+from cards import build_frames, open_report
+from instrument import percentile
+from layouts import detect
+from output import CsvSink
+from workbook import READERS
+from writer import DbWriter
+
+STAGE = "ET0"
+PHASES = ["open", "parse", "transform", "csv", "db"]
+# 各格式不依赖可选库的后端
+DEFAULT_BACKENDS = {"xlsx": "openpyxl", "xls": "xlrd"}
+
+
+def use_backend(name):
+    """固定读取后端, 该后端不支持的格式仍用默认后端"""
+    config.READER_BACKENDS = {
+        kind: [name if name in ("calamine", default) else default]
+        for kind, default in DEFAULT_BACKENDS.items()
+    }
+
+
+def peak_rss_mb():
+    # Linux 上 ru_maxrss 单位为 KB
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return self_rss / 1024, child_rss / 1024
+
+
+def entry_for(path):
+    st = os.stat(path)
+    return {
+        "path": str(path),
+        "size": st.st_size,
+        "mtime": st.st_mtime,
+        "hash": manifest.file_hash(path),
+        "old_hash": None,
+    }
+
+
+def run_phases(files, workdir):
+    """单进程逐文件执行, 以便把时间归到各阶段"""
+    timings = {phase: [] for phase in PHASES}
+    sink = CsvSink(workdir / "output")
+    writer = DbWriter(STAGE, f"sqlite:///{workdir / 'bench.db'}")
+    with writer.engine.begin() as conn:
+        schema.ensure_schema(conn)
+    batch, pending, rows = [], 0, 0
+    decrypt_seconds = 0.0
+    backends = Counter()
+
+    for n, path in enumerate(files, start=1):
+        entry = entry_for(path)
+        extra = {}
+        t0 = time.perf_counter()
+        wb = open_report(str(path), entry["hash"], extra)
+        t1 = time.perf_counter()
+        backends[wb.backend] += 1
+        with wb:
+            plan = detect(wb.sheet_names)
+            header, dfs = plan.extract(wb)
+        t2 = time.perf_counter()
+        summary, combined_df, total_df = build_frames(
+            n,
+            str(path),
+            STAGE,
+            dfs,
+            category=plan.layout.category,
+            time="",
+            **header,
+        )
+        combined_df["file_hash"] = total_df["file_hash"] = entry["hash"]
+        t3 = time.perf_counter()
+        sink.write(summary, combined_df)
+        t4 = time.perf_counter()
+        for phase, seconds in zip(PHASES, [t1 - t0, t2 - t1, t3 - t2, t4 - t3]):
+            timings[phase].append(seconds)
+        decrypt_seconds += extra.get("decrypt", 0.0)
+        rows += len(combined_df)
+
+        # 与 DbWriter 相同的批量提交, 批次耗时按文件数均摊
+        batch.append((summary, combined_df, total_df, entry))
+        pending += len(combined_df)
+        if pending >= config.WRITE_BATCH_ROWS or n == len(files):
+            start = time.perf_counter()
+            writer.flush(batch)
+            share = (time.perf_counter() - start) / len(batch)
+            timings["db"].extend([share] * len(batch))
+            batch, pending = [], 0
+    writer.engine.dispose()
+    return timings, rows, decrypt_seconds, dict(backends)
+
+
+def run_end_to_end(files, workdir, workers):
+    from ingest import ingest
+
+    stats = ingest(
+        [str(f) for f in files],
+        STAGE,
+        workers=workers,
+        url=f"sqlite:///{workdir / 'bench.db'}",
+        output_dir=workdir / "output",
+    )
+    return stats
+
+
+def report(result):
+    print(f"文件数: {result['files']}, 行数: {result['rows']}")
+    print(f"总耗时: {result['seconds']:.2f} 秒")
+    print(
+        f"吞吐量: {result['files_per_sec']:.1f} 文件/秒, "
+        f"{result['rows_per_sec']:.0f} 行/秒"
+    )
+    print(
+        f"峰值内存: 主进程 {result['peak_rss_mb']:.0f} MB, "
+        f"子进程 {result['peak_child_rss_mb']:.0f} MB"
+    )
+    if "phases" in result:
+        print(f"{'阶段':<10}{'合计(s)':>10}{'平均(ms)':>10}{'p95(ms)':>10}{'占比':>8}")
+        total = sum(p["total"] for p in result["phases"].values()) or 1
+        for phase, p in result["phases"].items():
+            print(
+                f"{phase:<12}{p['total']:>10.3f}{p['mean'] * 1000:>10.2f}"
+                f"{p['p95'] * 1000:>10.2f}{p['total'] / total:>8.1%}"
+            )
+        print(f"其中解密: {result['decrypt_seconds']:.3f} 秒")
+        backends = ", ".join(f"{k} {v}" for k, v in result["backends"].items())
+        print(f"读取后端: {backends}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", help="由 bench.make_corpus 生成的目录")
+    parser.add_argument("--end-to-end", action="store_true", help="走完整的多进程导入")
+    parser.add_argument("-w", "--workers", type=int, default=config.MAX_WORKERS)
+    parser.add_argument("--backend", choices=list(READERS), help="固定读取后端")
+    parser.add_argument("--json", help="结果另存为 JSON, 便于对比")
+    args = parser.parse_args(argv)
+
+    files = sorted(Path(args.corpus).glob("*.xls*"))
+    if not files:
+        print(f"未找到报告: {args.corpus}", file=sys.stderr)
+        return 1
+    if args.backend:
+        use_backend(args.backend)
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        # 每次测试使用独立的解密和解析缓存, 计入真实解密和解析耗时
+        config.DECRYPT_CACHE_DIR = str(workdir / "decrypted")
+        config.PARSE_CACHE_DIR = str(workdir / "parsed")
+        config.TIMING_LOG = str(workdir / "timings.jsonl")
+        start = time.perf_counter()
+        if args.end_to_end:
+            stats = run_end_to_end(files, workdir, args.workers)
+            rows = stats["rows"]
+        else:
+            timings, rows, decrypt_seconds, backends = run_phases(files, workdir)
+        seconds = time.perf_counter() - start
+
+    peak, peak_child = peak_rss_mb()
+    result = {
+        "files": len(files),
+        "rows": rows,
+        "seconds": seconds,
+        "files_per_sec": len(files) / seconds,
+        "rows_per_sec": rows / seconds,
+        "peak_rss_mb": peak,
+        "peak_child_rss_mb": peak_child,
+    }
+    if not args.end_to_end:
+        result["decrypt_seconds"] = decrypt_seconds
+        result["backends"] = backends
+        result["phases"] = {
+            phase: {
+                "total": sum(values),
+                "mean": sum(values) / len(values),
+                "p95": percentile(values, 0.95),
+            }
+            for phase, values in timings.items()
+        }
+    report(result)
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
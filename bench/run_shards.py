@@ -0,0 +1,99 @@
+"""分片导入测试: 在本机同时运行 N 个分片进程, 合并后与单进程导入的结果对比
+
+    python -m bench.make_corpus bench/corpus --files 200 --sheets 20
+    python -m bench.run_shards bench/corpus --shards 4 --workers 1
+"""
+import argparse
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+STAGE = "ET0"
+SCRIPT = Path(__file__).resolve().parent.parent / "report2csv.py"
+# 合并结果与单进程导入应一致的统计
+CHECKS = [
+    "select count(*) from measurement",
+    "select count(*) from Total",
+    "select count(distinct file_hash) from Total",
+    "select round(sum(conformance), 9), round(sum(value_conformance), 9) from Total",
+]
+
+
+def report2csv(workdir, *args):
+    # 在临时目录中运行, 日志和缓存都在该目录下
+    return subprocess.Popen(
+        [sys.executable, str(SCRIPT), *map(str, args)],
+        cwd=workdir,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def run_shards(corpus, count, workers, workdir):
+    start = time.perf_counter()
+    args = ("ingest", corpus, "-s", STAGE, "-w", workers)
+    processes = [
+        report2csv(workdir, *args, "--shard", f"{i}/{count}")
+        for i in range(1, count + 1)
+    ]
+    if any([p.wait() for p in processes]):
+        raise RuntimeError("分片导入失败, 详见 log/report2csv.log")
+    ingested = time.perf_counter() - start
+    if report2csv(workdir, "merge", "db/database.shard-*").wait():
+        raise RuntimeError("合并失败")
+    return ingested, time.perf_counter() - start - ingested
+
+
+def run_single(corpus, workers, workdir):
+    # 单独的目录, 不使用分片进程留下的解析缓存
+    workdir.mkdir()
+    start = time.perf_counter()
+    if report2csv(workdir, "ingest", corpus, "-s", STAGE, "-w", workers).wait():
+        raise RuntimeError("单进程导入失败")
+    return time.perf_counter() - start
+
+
+def compare(merged_db, single_db):
+    merged, single = sqlite3.connect(merged_db), sqlite3.connect(single_db)
+    diffs = [
+        sql
+        for sql in CHECKS
+        if merged.execute(sql).fetchall() != single.execute(sql).fetchall()
+    ]
+    merged.close()
+    single.close()
+    return diffs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", help="报告文件夹")
+    parser.add_argument("-n", "--shards", type=int, default=4)
+    parser.add_argument("-w", "--workers", type=int, default=1, help="每个分片的进程数")
+    args = parser.parse_args(argv)
+
+    corpus = Path(args.corpus).resolve()
+    files = len(list(corpus.rglob("*.xls*")))
+    if not files:
+        print(f"未找到报告: {args.corpus}", file=sys.stderr)
+        return 1
+    with tempfile.TemporaryDirectory() as tmp:
+        ingested, merged = run_shards(corpus, args.shards, args.workers, tmp)
+        print(
+            f"{args.shards} 个分片: 导入 {ingested:.2f} 秒 "
+            f"({files / ingested:.1f} 文件/秒), 合并 {merged:.2f} 秒"
+        )
+        single = run_single(corpus, args.workers, Path(tmp) / "single")
+        print(f"单进程: {single:.2f} 秒 ({files / single:.1f} 文件/秒)")
+        diffs = compare(
+            Path(tmp) / "db/database.db", Path(tmp) / "single/db/database.db"
+        )
+    for sql in diffs:
+        print(f"结果不一致: {sql}", file=sys.stderr)
+    return 1 if diffs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
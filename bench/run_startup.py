@@ -0,0 +1,108 @@
+"""启动测试: 从启动进程到界面第一次绘制的时间, 以及此时已载入的重型模块
+
+    python -m bench.run_startup
+    python -m bench.run_startup --runs 10 --json startup.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# 第一次绘制前不应载入的模块
+HEAVY_MODULES = ["pandas", "sqlalchemy", "openpyxl", "xlrd", "msoffcrypto", "numpy"]
+# 在子进程中按 gui.main 的步骤启动, 第一次绘制时输出各阶段耗时后退出
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from PySide6.QtCore import QEvent, QObject
+from PySide6.QtWidgets import QApplication
+import report2csv
+import gui
+imported = time.perf_counter()
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            painted = time.perf_counter()
+            print(json.dumps({{
+                "import": imported - start,
+                "window": shown - imported,
+                "paint": painted - start,
+                "loaded": [m for m in {heavy!r} if m in sys.modules],
+            }}), flush=True)
+            app.removeEventFilter(self)
+            app.quit()
+        return False
+
+app = QApplication([])
+first_paint = FirstPaint()
+app.installEventFilter(first_paint)
+widget = gui.Widget()
+shown = time.perf_counter()
+app.exec()
+"""
+
+
+def run_once(workdir):
+    code = PROBE.format(root=str(ROOT), heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", code],
+        cwd=workdir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    line = process.stdout.readline()
+    total = time.perf_counter() - start
+    _, errors = process.communicate()
+    if not line:
+        raise RuntimeError(f"界面启动失败: {errors}")
+    result = json.loads(line)
+    # 包括解释器启动
+    result["total"] = total
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--json", help="结果另存为 JSON, 便于对比")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 界面在当前目录下查找 .ui 和图标, 并创建 db/log 等目录
+        for name in ("report2csv.ui", "icon.ico"):
+            shutil.copy(ROOT / name, tmp)
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        # 第一次运行时磁盘缓存未命中, 不计入统计
+        first = run_once(tmp)
+        results = [run_once(tmp) for _ in range(args.runs)]
+
+    print(f"首次运行: {first['total']:.3f} 秒")
+    print(f"{'阶段':<10}{'中位数(s)':>12}{'最小(s)':>10}")
+    for key, label in [
+        ("total", "第一次绘制"),
+        ("import", "导入"),
+        ("window", "创建窗口"),
+    ]:
+        values = [r[key] for r in results]
+        print(f"{label:<10}{statistics.median(values):>12.3f}{min(values):>10.3f}")
+    loaded = sorted({m for r in results for m in r["loaded"]})
+    print(f"绘制前已载入: {', '.join(loaded) or '无'}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"first": first, "runs": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import logging
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import config
+from layouts import layout_version
+
+
+def cache_path(file_hash):
+    # 版式、读取逻辑或 pandas 版本变化后文件名不同, 旧缓存自然失效;
+    # pickle 的 DataFrame 在不同 pandas 版本间不保证可读
+    name = f"{file_hash}-{layout_version()}-{pd.__version__}.pkl"
+    return Path(config.PARSE_CACHE_DIR) / name
+
+
+def load(file_hash, timings=None):
+    """返回 (category, header, frame), 未命中时返回 None"""
+    path = cache_path(file_hash)
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            result = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # 损坏或无法还原的缓存按未命中处理并删除, 不导致文件解析失败
+        logging.warning(f"解析缓存无法读取, 已删除: {path.name}: {str(e)}")
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            pass
+        return None
+    # 以修改时间作为最近使用时间, 供 LRU 淘汰
+    path.touch()
+    if timings is not None:
+        timings["cache"] = time.perf_counter() - start
+        timings["parse_cached"] = True
+    return result
+
+
+def store(file_hash, category, header, frame):
+    path = cache_path(file_hash)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((category, header, frame), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def evict(max_bytes=None, cache_dir=None, pattern="*.pkl"):
+    """按最近使用时间删除最旧的缓存, 直到总大小不超过上限, 返回删除的文件数
+
+    默认处理解析缓存, 也用于解密缓存
+    """
+    if max_bytes is None:
+        max_bytes = config.PARSE_CACHE_MAX_MB * 1024 * 1024
+    cache_dir = Path(cache_dir or config.PARSE_CACHE_DIR)
+    if not cache_dir.exists():
+        return 0
+    entries = []
+    for path in cache_dir.glob(pattern):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            # 同时运行的其他分片进程已删除
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            # Windows 上其他进程正在读取的文件无法删除, 下次再处理
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def evict_decrypted():
+    return evict(
+        config.DECRYPT_CACHE_MAX_MB * 1024 * 1024,
+        config.DECRYPT_CACHE_DIR,
+        "*.xls*",
+    )
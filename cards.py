@@ -0,0 +1,114 @@
+import logging
+from datetime import datetime
+
+import pandas as pd
+
+import cache
+import decrypt
+from instrument import phase
+from layouts import detect
+from workbook import Workbook
+
+COLUMNS = [
+    "category",
+    "number",
+    "code",
+    "upper_tolerance",
+    "lower_tolerance",
+    "part1",
+    "part2",
+    "part3",
+    "part4",
+]
+TOTAL_COLUMNS = [
+    "number",
+    "title",
+    "stage",
+    "icmd",
+    "icmc",
+    "category",
+    "date",
+    "file",
+]
+
+
+def now():
+    # 与 QDateTime "yyyy-MM-dd hh:mm:ss zzz" 格式一致, 子进程中不依赖 Qt
+    t = datetime.now()
+    return f"{t:%Y-%m-%d %H:%M:%S} {t.microsecond // 1000:03d}"
+
+
+def open_decrypted(file, file_hash=None, timings=None):
+    if file_hash is None:
+        from manifest import file_hash as hash_file
+
+        file_hash = hash_file(file)
+    return Workbook(decrypt.decrypted_path(file, file_hash, timings))
+
+
+def open_report(file, file_hash=None, timings=None):
+    # 加密文件先按文件头识别, 避免先解析失败再解密
+    if decrypt.is_encrypted(file):
+        return open_decrypted(file, file_hash, timings)
+    try:
+        return Workbook(file)
+    except Exception:
+        # 文件头检查未识别的加密文件, 由 msoffcrypto 确认后解密
+        if not decrypt.office_encrypted(file):
+            raise
+        return open_decrypted(file, file_hash, timings)
+
+
+def parse_report(n, file, stage, file_hash=None, timings=None):
+    """在子进程中解析单个报告, 返回 (summary, combined_df, total_df)
+
+    timings 不为 None 时记录 open/decrypt/parse/transform 各阶段耗时;
+    给出 file_hash 时先查解析缓存, 命中则不打开工作簿
+    """
+    timings = {} if timings is None else timings
+    time = now()
+    cached = cache.load(file_hash, timings) if file_hash else None
+    if cached is None:
+        category, header, frame = extract_report(file, file_hash, timings)
+        if file_hash:
+            cache.store(file_hash, category, header, frame)
+    else:
+        category, header, frame = cached
+    with phase(timings, "transform"):
+        return build_frames(
+            n, file, stage, [frame], category=category, time=time, **header
+        )
+
+
+def extract_report(file, file_hash=None, timings=None):
+    """读取工作簿, 返回 (category, header, frame), 与阶段无关, 可缓存"""
+    timings = {} if timings is None else timings
+    with phase(timings, "open"):
+        wb = open_report(file, file_hash, timings)
+    with wb:
+        plan = detect(wb.sheet_names)
+        try:
+            with phase(timings, "parse"):
+                header, dfs = plan.extract(wb)
+                frame = pd.concat(dfs, ignore_index=True)
+        except Exception as e:
+            logging.error(f"{plan.layout.category}错误: {str(e)}")
+            raise
+    return plan.layout.category, header, frame
+
+
+def build_frames(n, file, stage, dfs, number, title, icmd, icmc, category, time):
+    combined_df = pd.concat(dfs, ignore_index=True)
+    combined_df.columns = COLUMNS
+    combined_df.insert(0, "no", n)
+    combined_df.insert(1, "part", number)
+    combined_df.insert(2, "name", title)
+    combined_df.insert(3, "stage", stage)
+    combined_df.dropna(subset=["code"], inplace=True)
+
+    total_df = pd.DataFrame(
+        [[number, title, stage, icmd, icmc, category, time, file]],
+        columns=TOTAL_COLUMNS,
+    )
+    summary = (n, file, number, title, icmd, icmc, category, time)
+    return summary, combined_df, total_df
@@ -1,4 +1,59 @@
 # 阶段列表
 STAGE_LIST = ['ET0','ET1','ET1','ET2','ET3','PT1','PT2','MDL','SOP']
 # 数据库
-DATABASE_URL = "sqlite:///db/database.db"
\ No newline at end of file
+DATABASE_URL = "sqlite:///db/database.db"
+# 并行解析进程数
+MAX_WORKERS = 4
+# 每个写入事务的行数
+WRITE_BATCH_ROWS = 20000
+# 写入队列长度 (已解析待写入的文件数)
+WRITE_QUEUE_SIZE = 64
+# SQLite 连接参数
+SQLITE_PRAGMAS = [
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "cache_size=-65536",
+]
+# 界面查询每个连接缓存的已编译语句数
+DB_STATEMENT_CACHE = 64
+# 加密报告的默认密码及解密缓存目录
+DECRYPT_PASSWORD = "VelvetSweatshop"
+DECRYPT_CACHE_DIR = "cache/decrypted"
+# 解密缓存为明文副本, 大小上限 (MB), 超出时删除最久未用的副本
+DECRYPT_CACHE_MAX_MB = 512
+# 输出格式: csv / parquet / feather
+OUTPUT_FORMAT = "csv"
+# 逐文件分阶段耗时 (JSON 行) 及运行汇总中列出的最慢文件数
+TIMING_LOG = "log/timings.jsonl"
+SLOW_FILES_TOP = 10
+# 同时提交到进程池、尚未取回结果的文件数上限
+MAX_INFLIGHT = 16
+# 界面合并刷新间隔 (毫秒) 及日志列表保留的行数
+UI_REFRESH_MS = 100
+LOG_MAX_LINES = 1000
+# 解析结果缓存目录及大小上限 (MB), 超出时删除最久未用的缓存
+PARSE_CACHE_DIR = "cache/parsed"
+PARSE_CACHE_MAX_MB = 2048
+# 工作簿读取后端, 按顺序尝试, 未安装或打开失败时使用下一个
+READER_BACKENDS = {
+    "xlsx": ["calamine", "openpyxl"],
+    "xls": ["calamine", "xlrd"],
+}
+# 监视模式: 阶段 -> 文件夹, 如 {"MDL": r"E:\Project\S32\06-零件报告\MDL"}
+WATCH_FOLDERS = {}
+# 文件停止变化多少秒后才导入, 避免读到未写完的文件
+WATCH_DEBOUNCE = 2.0
+# 没有 watchdog 或强制扫描时的扫描间隔 (秒); 网络共享上系统通知不可靠, 可设为 True
+WATCH_POLL_INTERVAL = 10.0
+WATCH_POLLING = False
+# 计算合格率与卡片 icmd/icmc 相差超过此值时告警
+ANALYTICS_CHECK_TOLERANCE = 0.01
+# 全表重算时每批处理的零件数
+ANALYTICS_BATCH_PARTS = 500
+# 单个文件解析超时 (秒), 超时或解析失败的文件记入隔离表, 文件变更前不再导入
+PARSE_TIMEOUT = 120
+# 进程崩溃、文件被占用等可能暂时性的错误的重试次数
+PARSE_RETRIES = 2
+# 界面显示后多久在后台预载入 pandas 等数据处理模块 (毫秒), None 时到第一次任务才载入
+WARMUP_DELAY_MS = 500
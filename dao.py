@@ -0,0 +1,111 @@
+import sqlite3
+import threading
+
+import config
+import schema
+
+TOTAL_DETAIL_SQL = (
+    "select number, title, stage, icmd, icmc, category, conformance, drift "
+    "from Total where number = ?"
+)
+STAGE_ROWS_SQL = (
+    "select number, code, part1 from measurement where part = ? and stage = ?"
+)
+
+
+def create_schema(conn):
+    """新建或刚删除的数据库也能查看, 旧版本的完整迁移由导入时的 ensure_schema 完成"""
+    with conn:
+        columns = [row[1] for row in conn.execute('pragma table_info("Total")')]
+        if columns:
+            for column, type_ in schema.TOTAL_ADDED_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f'alter table "Total" add column {column} {type_}')
+        for ddl in schema.DDL:
+            conn.execute(ddl)
+
+
+def check_stage(stage):
+    """阶段名只允许 STAGE_LIST 中的值"""
+    if stage not in schema.stages():
+        raise ValueError(f"未知阶段: {stage}")
+    return stage
+
+
+class Dao:
+    """界面使用的数据访问层
+
+    每个线程一个常驻 sqlite3 连接; 语句只用 ? 参数, SQL 文本固定,
+    由 sqlite3 按文本缓存已编译的语句 (cached_statements)
+    """
+
+    def __init__(self, path="db/database.db"):
+        self.path = path
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections = []
+
+    def connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            # 只在创建它的线程中使用; 关闭可能发生在界面线程
+            conn = sqlite3.connect(
+                self.path,
+                check_same_thread=False,
+                cached_statements=config.DB_STATEMENT_CACHE,
+            )
+            for pragma in config.SQLITE_PRAGMAS:
+                conn.execute(f"PRAGMA {pragma}")
+            create_schema(conn)
+            self.local.conn = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def close(self):
+        """关闭所有线程的连接, 删除数据库文件前调用"""
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []
+        # 其他线程下次访问时重新连接
+        self.local = threading.local()
+
+    def fetch(self, sql, params=()):
+        """返回 (列名, 行)"""
+        cursor = self.connection().execute(sql, params)
+        columns = [d[0] for d in cursor.description]
+        return columns, cursor.fetchall()
+
+    def total_detail(self, number):
+        return self.fetch(TOTAL_DETAIL_SQL, (number,))
+
+    def stage_pivot(self, number):
+        return self.fetch(schema.pivot_sql(), (number,))
+
+    def part_view(self, number):
+        """双击零件时的两个结果: Total 明细和各阶段对比"""
+        return self.total_detail(number), self.stage_pivot(number)
+
+    def stage_rows(self, number, stage):
+        return self.fetch(STAGE_ROWS_SQL, (number, check_stage(stage)))
+
+    def clear_stage(self, stage):
+        """删除某阶段的测量值及清单, 下次运行时重新导入, 返回删除的测量行数"""
+        check_stage(stage)
+        conn = self.connection()
+        with conn:
+            deleted = conn.execute(
+                "delete from measurement where stage = ?", (stage,)
+            ).rowcount
+            for table in ("manifest", "quarantine"):
+                conn.execute(f"delete from {table} where stage = ?", (stage,))
+        return deleted
+
+    def clear_total(self):
+        conn = self.connection()
+        with conn:
+            for table in ("Total", "manifest", "quarantine"):
+                conn.execute(f"drop table if exists {table}")
+        # 重建空表, 已打开的总表视图不会查询到不存在的表
+        create_schema(conn)
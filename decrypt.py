@@ -0,0 +1,84 @@
+import os
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+import msoffcrypto
+import olefile
+
+import config
+
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+XL_FILEPASS = 0x002F
+XL_EOF = 0x000A
+
+
+def has_filepass(stream):
+    # FILEPASS 在全局子流开头, 之前可能有 WRITEPROTECT 等记录; 记录头本身不加密
+    while len(header := stream.read(4)) == 4:
+        record, size = struct.unpack("<HH", header)
+        if record == XL_FILEPASS:
+            return True
+        if record == XL_EOF:
+            break
+        stream.seek(size, 1)
+    return False
+
+
+def is_encrypted(file):
+    """根据 OLE 文件头判断是否加密, 不解析工作簿"""
+    with open(file, "rb") as f:
+        if f.read(8) != OLE_MAGIC:
+            # xlsx 加密后是 OLE 容器, 普通 xlsx 是 zip
+            return False
+    with olefile.OleFileIO(file) as ole:
+        if ole.exists("EncryptionInfo"):
+            return True
+        if not ole.exists("Workbook"):
+            return False
+        with ole.openstream("Workbook") as stream:
+            return has_filepass(stream)
+
+
+def office_encrypted(file):
+    """由 msoffcrypto 判断, 用于文件头检查未识别、打开又失败的文件"""
+    try:
+        with open(file, "rb") as f:
+            return msoffcrypto.OfficeFile(f).is_encrypted()
+    except Exception:
+        return False
+
+
+def decrypted_path(file, file_hash, timings=None):
+    """解密到缓存目录并返回路径, 同一内容只解密一次"""
+    cache_dir = Path(config.DECRYPT_CACHE_DIR)
+    target = cache_dir / f"{file_hash}{Path(file).suffix}"
+    if target.exists():
+        # 以修改时间作为最近使用时间, 供 cache.evict_decrypted 淘汰
+        try:
+            os.utime(target)
+        except FileNotFoundError:
+            # 刚被其他进程淘汰, 重新解密
+            pass
+        else:
+            if timings is not None:
+                timings["decrypt_cached"] = True
+            return target
+
+    start = time.perf_counter()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # 直接解密写入磁盘, 读取时由 xlrd/openpyxl 按文件打开
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with open(file, "rb") as f, os.fdopen(fd, "wb") as out:
+            office = msoffcrypto.OfficeFile(f)
+            office.load_key(password=config.DECRYPT_PASSWORD)
+            office.decrypt(out)
+        os.replace(tmp, target)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    if timings is not None:
+        timings["decrypt"] = time.perf_counter() - start
+    return target
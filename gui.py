@@ -0,0 +1,541 @@
+import logging
+import shutil
+import subprocess
+import time
+from functools import partial
+from pathlib import Path
+from PySide6.QtGui import QIcon
+from PySide6.QtWidgets import (
+    QApplication,
+    QWidget,
+    QFileDialog,
+    QHeaderView,
+)
+from PySide6.QtCore import (
+    QObject,
+    Signal,
+    Slot,
+    QRunnable,
+    QThreadPool,
+    QTimer,
+    Qt,
+)
+
+import config
+from models import PagedTableModel, ResultsModel, RowsModel
+from watch import Watcher
+
+try:
+    # 由 pyside6-uic report2csv.ui -o ui_report2csv.py 生成, 修改 .ui 后需重新生成
+    from ui_report2csv import Ui_Form
+
+    class Form(QWidget, Ui_Form):
+        """预编译的界面, 控件为实例属性, 与 QUiLoader 载入的对象用法相同"""
+
+        def __init__(self):
+            super().__init__()
+            self.setupUi(self)
+
+except ImportError:
+    Form = None
+
+STAGE_LIST = config.STAGE_LIST
+DATABASE_URL = config.DATABASE_URL
+# 估算列宽时采样的行数
+SAMPLE_ROWS = 100
+
+
+def load_ui():
+    if Form is not None:
+        return Form()
+    # 未生成 ui_report2csv.py 时运行时解析 .ui
+    from PySide6.QtUiTools import QUiLoader
+
+    return QUiLoader().load("report2csv.ui")
+
+
+class Signals(QObject):
+    started = Signal(int)
+    completed = Signal(tuple)
+    error = Signal(str)
+    finished = Signal(dict)
+    skipped = Signal(int)
+    throughput = Signal(dict)
+    batch = Signal(str, list)
+
+
+class QuerySignals(QObject):
+    done = Signal(object)
+    failed = Signal(str)
+
+
+class QueryTask(QRunnable):
+    """在查询线程中执行 DAO 方法, 结果通过信号交回界面线程"""
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = QuerySignals()
+
+    @Slot()
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            logging.error(f"查询错误: {str(e)}")
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.done.emit(result)
+
+
+class Worker(QRunnable):
+    def __init__(self, files, stage):
+        super().__init__()
+        self.files = files
+        self.stage = stage
+        self.signals = Signals()
+
+    @Slot()
+    def run(self):
+        # 解析在进程池中并行执行, 仅数据库写入在本线程中串行
+        try:
+            from ingest import ingest
+
+            stats = ingest(
+                self.files,
+                self.stage,
+                on_started=self.signals.started.emit,
+                on_completed=self.signals.completed.emit,
+                on_error=self.signals.error.emit,
+                on_skipped=self.signals.skipped.emit,
+                on_progress=self.signals.throughput.emit,
+            )
+        except Exception as e:
+            # 整体失败 (如数据库被占用) 时也要通知界面, 否则按钮一直处于运行中
+            logging.error(f"导入中止: {str(e)}")
+            stats = {"error": str(e)}
+        self.signals.finished.emit(stats)
+
+
+class Warmup(QRunnable):
+    """后台载入导入和查询用到的模块, 第一次任务时不必等待"""
+
+    @Slot()
+    def run(self):
+        start = time.perf_counter()
+        try:
+            import dao
+            import ingest
+        except Exception as e:
+            # 缺少依赖等错误在第一次任务时再报告
+            logging.warning(f"预载入失败: {str(e)}")
+            return
+        logging.info(f"预载入耗时 {time.perf_counter() - start:.2f} 秒")
+
+
+class Widget(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setup_ui()
+        self.setup_dir()
+        self.setup_slot()
+
+    def setup_ui(self):
+        self.ui = load_ui()
+        self.ui.show()
+
+    def setup_dir(self):
+        db_dir = Path("db")
+        db_dir.mkdir(exist_ok=True)
+        log_dir = Path("log")
+        log_dir.mkdir(exist_ok=True)
+        output_dir = Path("output")
+        output_dir.mkdir(exist_ok=True)
+        csv_dir = Path("csv")
+        csv_dir.mkdir(exist_ok=True)
+        self.files = []
+        self.stage = self.ui.comboBox.currentText()
+        self.run_files = []
+        self.run_stage = None
+        self.dao = None
+        # 单个常驻查询线程, 线程不退出, 其连接和语句缓存一直可用
+        self.query_pool = QThreadPool(self)
+        self.query_pool.setMaxThreadCount(1)
+        self.query_pool.setExpiryTimeout(-1)
+        if config.WARMUP_DELAY_MS is not None:
+            # 先显示窗口, 再在查询线程中预载入
+            QTimer.singleShot(
+                config.WARMUP_DELAY_MS, lambda: self.query_pool.start(Warmup())
+            )
+        self.folder = None
+        self.watcher = None
+        self.watch_queue = []
+        self.done = 0
+        self.current = 0
+        self.log_lines = []
+        # 结果和日志先缓存, 由定时器合并刷新, 避免逐文件重绘
+        self.results_model = ResultsModel(self)
+        self.ui.tableView_5.setModel(self.results_model)
+        self.ui.listWidget.setUniformItemSizes(True)
+        self.ui_timer = QTimer(self)
+        self.ui_timer.setInterval(config.UI_REFRESH_MS)
+        self.ui_timer.timeout.connect(self.refresh_ui)
+
+    def setup_slot(self):
+        self.ui.pushButton.clicked.connect(self.get_files)
+        self.ui.pushButton_2.clicked.connect(self.start_jobs)
+        self.ui.pushButton_5.clicked.connect(self.clear_db)
+        self.ui.pushButton_6.clicked.connect(self.clear_log)
+        self.ui.pushButton_9.clicked.connect(self.model_stage)
+        self.ui.pushButton_10.clicked.connect(self.delete_db)
+        self.ui.pushButton_21.clicked.connect(self.get_folder)
+        self.ui.pushButton_11.clicked.connect(self.clear_total)
+        self.ui.pushButton_12.clicked.connect(self.model_total)
+        self.ui.pushButton_7.clicked.connect(self.setup_config)
+        self.ui.pushButton_8.clicked.connect(self.open_config)
+        self.ui.pushButton_14.clicked.connect(self.delete_output)
+        self.ui.checkBox.toggled.connect(self.toggle_watch)
+        self.ui.tableView_2.doubleClicked.connect(self.query_total)
+        self.ui.lineEdit_5.editingFinished.connect(self.filter_total)
+        self.ui.lineEdit_6.editingFinished.connect(self.filter_stage)
+        for view in (self.ui.tableView, self.ui.tableView_2):
+            view.horizontalHeader().sortIndicatorChanged.connect(
+                partial(self.check_sort, view)
+            )
+
+    def setup_config(self):
+        self.ui.comboBox.clear()
+        self.ui.comboBox.addItems(STAGE_LIST)
+
+    def open_config(self):
+        config_file = Path("config.py")
+        if config_file.exists():
+            subprocess.Popen(["notepad.exe", str(config_file)])
+
+    def start_jobs(self):
+        if self.files:
+            self.run_jobs(list(self.files), self.stage)
+
+    def run_jobs(self, files, stage):
+        # 运行中的文件和阶段单独保存, 监视批次不覆盖对话框中选择的文件
+        self.run_files = files
+        self.run_stage = stage
+        self.ui.progressBar.setMaximum(len(files))
+        self.restart()
+        pool = QThreadPool.globalInstance()
+        worker = Worker(files, stage)
+        worker.signals.completed.connect(self.complete)
+        worker.signals.started.connect(self.start)
+        worker.signals.finished.connect(self.finish)
+        worker.signals.skipped.connect(self.skip)
+        worker.signals.error.connect(self.fail)
+        worker.signals.throughput.connect(self.show_throughput)
+        pool.start(worker)
+
+    def toggle_watch(self, checked):
+        if not checked:
+            if self.watcher is not None:
+                self.watcher.stop()
+                self.watcher = None
+            self.ui.lineEdit_3.setText("已停止监视")
+            return
+        # 未配置时监视当前选择的文件夹
+        folders = config.WATCH_FOLDERS
+        if not folders and self.folder:
+            folders = {self.ui.comboBox.currentText(): self.folder}
+        if not folders:
+            self.ui.lineEdit_3.setText("请先在 config.WATCH_FOLDERS 中配置或选择文件夹")
+            self.ui.checkBox.setChecked(False)
+            return
+        self.watch_signals = Signals()
+        self.watch_signals.batch.connect(self.queue_batch)
+        self.watcher = Watcher(folders, self.watch_signals.batch.emit)
+        self.watcher.start()
+        self.ui.lineEdit_3.setText(f"正在监视: {', '.join(map(str, folders.values()))}")
+
+    def queue_batch(self, stage, files):
+        self.watch_queue.append((stage, files))
+        self.next_batch()
+
+    def next_batch(self):
+        if not self.watch_queue or not self.ui.pushButton_2.isEnabled():
+            return
+        # 同一阶段排队中的批次合并为一次导入
+        stage = self.watch_queue[0][0]
+        files = [f for s, batch in self.watch_queue if s == stage for f in batch]
+        self.watch_queue = [item for item in self.watch_queue if item[0] != stage]
+        self.run_jobs(list(dict.fromkeys(files)), stage)
+
+    def restart(self):
+        self.ui.progressBar.setValue(0)
+        self.ui.progressBar.setFormat("%p%")
+        self.done = 0
+        self.current = 0
+        self.ui.pushButton_2.setEnabled(False)
+        self.ui.pushButton_2.setText("运行中")
+        self.ui.pushButton_2.setStyleSheet("background-color: red;color: white")
+
+        self.results_model.clear()  # 清空表格
+        self.ui_timer.start()
+
+    def start(self, n):
+        self.log_lines.append(f"任务 #{n}:{Path(self.run_files[n-1])} 已启动...")
+        self.current = n
+
+    def complete(self, msg):
+        n = msg[0]
+        self.log_lines.append(f"任务 #{n}:{Path(self.run_files[n-1])} 已完成")
+        self.results_model.append(self.run_stage, msg)
+        self.done += 1
+
+    def skip(self, n):
+        self.log_lines.append(f"任务 #{n}:{Path(self.run_files[n-1])} 未变更或已隔离, 已跳过")
+        self.done += 1
+
+    def fail(self, msg):
+        self.log_lines.append(f"失败: {msg}")
+        self.done += 1
+
+    def refresh_ui(self):
+        if self.log_lines:
+            log = self.ui.listWidget
+            log.addItems(self.log_lines)
+            self.log_lines = []
+            for _ in range(log.count() - config.LOG_MAX_LINES):
+                log.takeItem(0)
+            log.scrollToBottom()
+        if self.current:
+            name = Path(self.run_files[self.current - 1]).name
+            self.ui.lineEdit.setText(f"{self.current}/{len(self.run_files)}: {name}")
+        if self.results_model.flush():
+            view = self.ui.tableView_5
+            if self.results_model.rowCount() <= SAMPLE_ROWS:
+                view.resizeColumnsToContents()
+            view.scrollToBottom()
+        self.update_progress()
+
+    def update_progress(self):
+        self.ui.progressBar.setValue(self.done)
+        if self.done >= len(self.run_files):
+            self.ui_timer.stop()
+            self.reset_button()
+
+    def reset_button(self):
+        self.ui.pushButton_2.setEnabled(True)
+        self.ui.pushButton_2.setStyleSheet(
+            "background-color: rgb(0, 170, 0); color: white"
+        )
+        self.ui.pushButton_2.setText("开始")
+
+    def show_throughput(self, snapshot):
+        self.ui.progressBar.setFormat(
+            f"%v/%m  {snapshot['files_per_sec']:.1f} 文件/秒"
+        )
+
+    def finish(self, stats):
+        self.refresh_ui()
+        self.ui_timer.stop()
+        # 无论结果如何都恢复按钮
+        self.reset_button()
+        if "error" in stats:
+            self.ui.lineEdit_3.setText(f"导入中止: {stats['error']}")
+        else:
+            self.ui.lineEdit_3.setText(
+                f"新增 {stats['new']}, 变更 {stats['changed']}, "
+                f"跳过 {stats['skipped']}, 失败 {stats['failed']}, "
+                f"已隔离 {stats['quarantined']}; 写入 {stats['rows']} 行, "
+                f"耗时 {stats['seconds']:.2f} 秒, {stats['rows_per_sec']:.0f} 行/秒, "
+                f"缓存命中率 {stats['cache_hit_rate']:.0%}"
+            )
+        self.next_batch()
+
+    def run_query(self, on_done, fn, *args):
+        task = QueryTask(fn, *args)
+        task.signals.done.connect(on_done)
+        task.signals.failed.connect(self.query_failed)
+        self.query_pool.start(task)
+
+    def query_failed(self, msg):
+        self.ui.lineEdit_3.setText(f"查询失败: {msg}")
+
+    def clear_db(self):
+        self.stage = self.ui.comboBox.currentText()
+        # 同时清除清单, 下次运行时重新导入该阶段
+        self.run_query(self.stage_cleared, self.get_dao().clear_stage, self.stage)
+
+    def stage_cleared(self, deleted):
+        self.ui.lineEdit_3.setText(f"{self.stage}表已清空, 删除 {deleted} 行")
+
+    def clear_total(self):
+        self.run_query(self.total_cleared, self.get_dao().clear_total)
+
+    def total_cleared(self, _):
+        self.ui.lineEdit_3.setText("总表已清空")
+
+    def delete_db(self):
+        # 视图不再访问即将关闭的连接
+        for view in (
+            self.ui.tableView,
+            self.ui.tableView_2,
+            self.ui.tableView_3,
+            self.ui.tableView_4,
+        ):
+            model = view.model()
+            view.setModel(None)
+            if model is not None:
+                model.deleteLater()
+        # 等待在途查询结束后关闭所有线程的连接
+        self.query_pool.waitForDone()
+        if self.dao is not None:
+            self.dao.close()
+        file_db = Path("db/database.db")
+        if file_db.exists():
+            file_db.unlink()
+        self.ui.lineEdit_3.setText("数据库已删除")
+        # self.ui.lineEdit_3.setStyleSheet("color: red")
+
+    def delete_output(self):
+        output_dir = Path("output")
+        if output_dir.exists():
+            for file in output_dir.iterdir():
+                # parquet/feather 数据集和分片输出是子目录
+                if file.is_dir():
+                    shutil.rmtree(file)
+                else:
+                    file.unlink()
+        self.ui.lineEdit_3.setText("输出文件已删除")
+
+    def clear_log(self):
+        with open("log/report2csv.log", "w") as f:
+            f.write("")
+        # 逐文件耗时日志一并清空
+        timing_log = Path(config.TIMING_LOG)
+        if timing_log.exists():
+            timing_log.write_text("")
+        self.ui.lineEdit_3.setText("日志已清空")
+
+    def get_folder(self):
+        self.stage = self.ui.comboBox.currentText()
+        _folder = QFileDialog.getExistingDirectory(
+            self,
+            "打开文件夹",
+            r"E:\Project\S32\06-零件报告\MDL",
+        )
+        self.folder = _folder or None
+        self.files = list(map(str, Path(_folder).rglob("*.xls*")))
+        if self.files:
+            self.ui.progressBar.setMaximum(len(self.files))
+
+    def get_files(self):
+        self.stage = self.ui.comboBox.currentText()
+        self.files, _ = QFileDialog.getOpenFileNames(
+            self,
+            "打开文件",
+            r"E:\Project\S32\06-零件报告\MDL\外制\东实",
+            "Excel文件 (*.xls*)",
+        )
+        if self.files:
+            self.ui.progressBar.setMaximum(len(self.files))
+
+    def show_paged(self, view, model):
+        model.error.connect(self.query_failed)
+        # 只按已载入的前若干行估算列宽
+        view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        view.horizontalHeader().setResizeContentsPrecision(SAMPLE_ROWS)
+        view.setModel(model)
+        view.setSortingEnabled(True)
+        if model.last is None and not model.exhausted:
+            model.refresh()
+        view.resizeColumnsToContents()
+
+    def check_sort(self, view, section, order):
+        # 没有索引的列不排序, 排序标记恢复为原始顺序
+        model = view.model()
+        if isinstance(model, PagedTableModel) and not model.can_sort(section):
+            view.horizontalHeader().setSortIndicator(-1, order)
+
+    def get_dao(self):
+        # 数据访问层依赖 SQLAlchemy 等模块, 第一次查询时才创建
+        if self.dao is None:
+            from dao import Dao
+
+            self.dao = Dao()
+        return self.dao
+
+    def model_stage(self):
+        import schema
+
+        self.stage = self.ui.comboBox.currentText()
+        self.table_model = PagedTableModel(
+            self.get_dao().connection(),
+            "measurement",
+            schema.MEASUREMENT_COLUMNS[:-1],
+            where="stage = ?",
+            params=[self.stage],
+            sortable=schema.SORT_COLUMNS["measurement"],
+            parent=self,
+        )
+        self.table_model.set_filter("part", self.ui.lineEdit_6.text().strip())
+        self.show_paged(self.ui.tableView, self.table_model)
+
+    def model_total(self):
+        import schema
+
+        self.stage = self.ui.comboBox.currentText()
+        self.total_model = PagedTableModel(
+            self.get_dao().connection(),
+            "Total",
+            schema.TOTAL_COLUMNS[:-1] + schema.ANALYTICS_COLUMNS,
+            sortable=schema.SORT_COLUMNS["Total"],
+            parent=self,
+        )
+        self.total_model.set_filter("number", self.ui.lineEdit_5.text().strip())
+        self.show_paged(self.ui.tableView_2, self.total_model)
+
+    def filter_stage(self):
+        # 按零件号前缀筛选, 在 SQL 中执行
+        model = self.ui.tableView.model()
+        if model is not None:
+            model.set_filter("part", self.ui.lineEdit_6.text().strip())
+
+    def filter_total(self):
+        model = self.ui.tableView_2.model()
+        if model is not None:
+            model.set_filter("number", self.ui.lineEdit_5.text().strip())
+
+    def current_part(self):
+        index = self.ui.tableView_2.currentIndex()
+        return index.sibling(index.row(), 0).data()
+
+    def query_total(self):
+        self.run_query(self.show_part, self.get_dao().part_view, self.current_part())
+
+    def show_part(self, result):
+        (columns, rows), (pivot_columns, pivot_rows) = result
+        self.query_model = RowsModel(columns, rows, self)
+        self.ui.tableView_3.setModel(self.query_model)
+        self.ui.tableView_3.resizeColumnsToContents()
+        # 各阶段测量值并排, 一次索引查找
+        self.stage_model = RowsModel(pivot_columns, pivot_rows, self)
+        self.ui.tableView_4.setModel(self.stage_model)
+        self.ui.tableView_4.resizeColumnsToContents()
+        self.ui.tabWidget.setCurrentIndex(4)
+
+    def query_stage(self):
+        self.run_query(
+            self.show_stage, self.get_dao().stage_rows, self.current_part(), self.stage
+        )
+
+    def show_stage(self, result):
+        self.stage_model = RowsModel(*result, self)
+        self.ui.tableView_4.setModel(self.stage_model)
+        self.ui.tableView_4.resizeColumnsToContents()
+        self.ui.tabWidget.setCurrentIndex(4)
+
+
+def main():
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication([])
+    widget = Widget()
+    return app.exec()
@@ -0,0 +1,304 @@
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import cache
+import config
+import manifest
+import schema
+from cards import parse_report
+from instrument import RunStats, phase
+from output import create_sink
+from writer import DbWriter
+
+# 解析阶段 (子进程中) 的耗时, 命中缓存时只有 cache 和 transform
+PARSE_PHASES = ("cache", "open", "parse", "transform")
+# 等待解析结果时检查超时的间隔 (秒)
+TICK = 1.0
+# 工作进程在共享数组中的槽位: 每个进程记录 (任务序号, 进程号, 开始解析的时间)
+SLOT_FIELDS = 3
+WORKER = {}
+
+
+class ParseTimeout(Exception):
+    def __init__(self, seconds):
+        super().__init__(f"解析超过 {seconds} 秒")
+
+
+def retryable(e):
+    # 进程崩溃和文件被占用等 IO 错误可能是暂时的, 解析错误重试也不会成功
+    if isinstance(e, BrokenProcessPool):
+        return True
+    return isinstance(e, OSError) and not isinstance(e, FileNotFoundError)
+
+
+def describe(e):
+    if isinstance(e, BrokenProcessPool):
+        return "解析进程异常退出"
+    return f"{type(e).__name__}: {str(e)}"
+
+
+def init_worker(slots, counter):
+    with counter.get_lock():
+        WORKER["slot"] = counter.value * SLOT_FIELDS
+        counter.value += 1
+    WORKER["slots"] = slots
+
+
+class ParsePool:
+    """进程池, 工作进程自己记录开始解析的时间, 超时时只结束卡住的进程"""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.pool = self.create()
+
+    def create(self):
+        self.slots = multiprocessing.RawArray("d", SLOT_FIELDS * self.workers)
+        counter = multiprocessing.Value("i", 0)
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=init_worker,
+            initargs=(self.slots, counter),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.pool.shutdown(cancel_futures=True)
+
+    def submit(self, *args):
+        try:
+            return self.pool.submit(*args)
+        except BrokenProcessPool:
+            self.restart()
+            return self.pool.submit(*args)
+
+    def running(self):
+        """正在解析的任务: {任务序号: (进程号, 开始时间)}"""
+        result = {}
+        for i in range(0, len(self.slots), SLOT_FIELDS):
+            n, pid, since = self.slots[i : i + SLOT_FIELDS]
+            if since:
+                result[int(n)] = (int(pid), since)
+        return result
+
+    def kill(self, n):
+        """结束仍在解析任务 n 的进程, 执行器随后把池标记为损坏"""
+        pid = self.running().get(n, (None,))[0]
+        process = (self.pool._processes or {}).get(pid)
+        if process is not None:
+            process.terminate()
+
+    def restart(self):
+        # 池损坏后执行器已自行结束其余进程; 等管理线程退出再重建, 退出解释器时不会挂起
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.pool = self.create()
+
+
+def timed_parse(n, file, stage, file_hash):
+    slots, i = WORKER.get("slots"), WORKER.get("slot", 0)
+    if slots is not None:
+        slots[i], slots[i + 1] = n, os.getpid()
+        slots[i + 2] = time.monotonic()
+    try:
+        timings = {}
+        result = parse_report(n, file, stage, file_hash, timings)
+        return timings, result
+    finally:
+        if slots is not None:
+            slots[i + 2] = 0.0
+
+
+def ingest(
+    files,
+    stage,
+    workers=None,
+    url=None,
+    output_dir="output",
+    output_format=None,
+    on_started=None,
+    on_parsed=None,
+    on_completed=None,
+    on_error=None,
+    on_skipped=None,
+    on_progress=None,
+    force=False,
+):
+    """多进程解析报告, 由单个写入线程批量写入数据库, 未变更的文件跳过
+
+    force 为 True 时忽略清单重新导出, 已缓存的文件不再读取工作簿
+    """
+    run_stats = RunStats(config.TIMING_LOG, on_update=on_progress)
+    writer = DbWriter(
+        stage,
+        url,
+        on_completed=on_completed,
+        on_error=on_error,
+        run_stats=run_stats,
+    )
+    with writer.engine.begin() as conn:
+        schema.ensure_schema(conn)
+        jobs, skipped, counts = manifest.plan(conn, files, stage, force, on_error)
+    logging.info(
+        f"新增 {counts['new']}, 变更 {counts['changed']}, 跳过 {counts['skipped']}, "
+        f"已隔离 {counts['quarantined']}, 无法读取 {counts['unreadable']}"
+    )
+    if on_skipped:
+        for n in skipped:
+            on_skipped(n)
+
+    sink = create_sink(output_format or config.OUTPUT_FORMAT, output_dir)
+    writer.start()
+    decrypt_stats = {"decrypted": 0, "decrypt_cached": 0, "decrypt_seconds": 0.0}
+    cache_stats = {True: 0, False: 0}
+    quarantined = []  # (entry, reason, attempts)
+    attempts = {}
+    retry = deque()
+    # 进程崩溃时在途的文件, 逐个单独解析以找出导致崩溃的文件
+    isolate = deque()
+
+    def failed(job, e, again=retry):
+        n, file, entry = job
+        attempts[n] = attempts.get(n, 0) + 1
+        if retryable(e) and attempts[n] <= config.PARSE_RETRIES:
+            logging.warning(f"重试 {file} ({attempts[n]}): {describe(e)}")
+            again.append(job)
+            return
+        logging.error(f"Error processing {file}: {describe(e)}")
+        quarantined.append((entry, describe(e), attempts[n]))
+        run_stats.failed(n)
+        if on_error:
+            on_error(f"{file}: {describe(e)}")
+
+    def submit(job):
+        n, file, entry = job
+        future = pool.submit(timed_parse, n, file, stage, entry["hash"])
+        futures[future] = job
+        if on_started and n not in attempts:
+            on_started(n)
+        return future
+
+    # 只保持有限个文件在途, 结果取回后再提交下一个, 内存不随文件数增长
+    window = max(config.MAX_INFLIGHT, workers or config.MAX_WORKERS)
+    pending = iter(jobs)
+    with ParsePool(workers or config.MAX_WORKERS) as pool:
+        futures = {}
+        suspect = None
+        timed_out = set()  # 因超时被结束的任务序号
+        while True:
+            if isolate:
+                if not futures:
+                    suspect = submit(isolate.popleft())
+            else:
+                # 新文件优先, 重试的文件排在最后
+                while len(futures) < window:
+                    job = next(pending, None) or (retry.popleft() if retry else None)
+                    if job is None:
+                        break
+                    submit(job)
+            if not futures:
+                break
+            done, _ = wait(futures, timeout=TICK, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                job = futures.pop(future)
+                n, file, entry = job
+                try:
+                    timings, (summary, combined_df, total_df) = future.result()
+                except BrokenProcessPool as e:
+                    broken = True
+                    if n in timed_out:
+                        failed(job, ParseTimeout(config.PARSE_TIMEOUT))
+                    elif timed_out:
+                        # 进程是因其他文件超时被结束的, 不计重试次数
+                        retry.appendleft(job)
+                    elif future is suspect:
+                        failed(job, e, isolate)
+                    else:
+                        # 无法确定是哪个文件导致崩溃, 不计重试次数, 改为逐个解析
+                        isolate.append(job)
+                    continue
+                except Exception as e:
+                    failed(job, e)
+                    continue
+                try:
+                    if "decrypt" in timings:
+                        decrypt_stats["decrypted"] += 1
+                        decrypt_stats["decrypt_seconds"] += timings["decrypt"]
+                    elif "decrypt_cached" in timings:
+                        decrypt_stats["decrypt_cached"] += 1
+                    cache_stats["parse_cached" in timings] += 1
+                    if on_parsed:
+                        seconds = sum(timings.get(k, 0.0) for k in PARSE_PHASES)
+                        on_parsed(n, file, seconds, len(combined_df))
+                    combined_df["file_hash"] = entry["hash"]
+                    total_df["file_hash"] = entry["hash"]
+                    with phase(timings, "output"):
+                        sink.write(summary, combined_df)
+                    run_stats.parsed(n, file, timings, len(combined_df))
+                    # 写入队列满时在此阻塞, 同时暂停提交新文件
+                    writer.put(summary, combined_df, total_df, entry)
+                except Exception as e:
+                    logging.error(f"Error processing {file}: {str(e)}")
+                    run_stats.failed(n)
+                    if on_error:
+                        on_error(f"{file}: {str(e)}")
+
+            # 超时从工作进程开始解析算起, 排队等待的时间不计入
+            now = time.monotonic()
+            inflight = {job[0] for job in futures.values()}
+            for n, (pid, since) in pool.running().items():
+                if n in inflight and n not in timed_out:
+                    if now - since > config.PARSE_TIMEOUT:
+                        timed_out.add(n)
+                        pool.kill(n)
+            if broken:
+                pool.restart()
+                for job in reversed(list(futures.values())):
+                    if job[0] in timed_out:
+                        failed(job, ParseTimeout(config.PARSE_TIMEOUT))
+                    else:
+                        # 其余在途文件重新提交, 不计入重试次数
+                        (retry if timed_out else isolate).appendleft(job)
+                futures.clear()
+                timed_out.clear()
+
+    sink.close()
+    stats = writer.close()
+    if quarantined:
+        with writer.engine.begin() as conn:
+            for entry, reason, tries in quarantined:
+                manifest.quarantine(conn, stage, entry, reason, tries)
+    # 内容已变化、清单中不再引用的旧版本从输出数据集中删除
+    replaced = {
+        entry["old_hash"]
+        for _, _, entry in jobs
+        if entry["old_hash"] not in (None, entry["hash"])
+    }
+    if replaced:
+        with writer.engine.begin() as conn:
+            replaced = manifest.unreferenced(conn, stage, replaced)
+        sink.remove(stage, replaced)
+    stats["failed"] = len(quarantined) + counts["unreadable"]
+    stats.update(counts)
+    stats.update(decrypt_stats)
+    stats["timing"] = run_stats.close()
+    looked_up = cache_stats[True] + cache_stats[False]
+    stats["cache_hits"] = cache_stats[True]
+    stats["cache_misses"] = cache_stats[False]
+    stats["cache_hit_rate"] = cache_stats[True] / looked_up if looked_up else 0.0
+    stats["cache_evicted"] = cache.evict()
+    stats["decrypt_evicted"] = cache.evict_decrypted()
+    logging.info(
+        f"写入 {stats['files']} 个文件, {stats['rows']} 行, "
+        f"{stats['rows_per_sec']:.0f} 行/秒; 解密 {stats['decrypted']} 个文件 "
+        f"({stats['decrypt_seconds']:.2f} 秒), 解密缓存命中 {stats['decrypt_cached']}; "
+        f"解析缓存命中 {stats['cache_hits']}/{looked_up}, "
+        f"淘汰 {stats['cache_evicted']}, 解密缓存淘汰 {stats['decrypt_evicted']}"
+    )
+    return stats
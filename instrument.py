@@ -0,0 +1,136 @@
+import heapq
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import config
+
+# decrypt 包含在 open 中, 不重复计入 total; 命中解析缓存时只有 cache 没有 open/parse
+PHASES = ["cache", "open", "decrypt", "parse", "transform", "output", "db"]
+
+
+@contextmanager
+def phase(timings, name):
+    """把代码块的耗时累加到 timings[name], 使用单调时钟"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class RunStats:
+    """汇总一次运行的逐文件分阶段耗时, 并以 JSON 行写入日志"""
+
+    def __init__(self, log_file=None, top=None, on_update=None):
+        self.run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+        self.top = top or config.SLOW_FILES_TOP
+        self.on_update = on_update
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.values = {name: [] for name in PHASES + ["total"]}
+        self.slowest = []  # (total, file) 小顶堆
+        self.files = 0
+        self.rows = 0
+        self.start = time.perf_counter()
+        self.log = None
+        if log_file:
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+            self.log = open(log_file, "a", encoding="utf-8")
+
+    def parsed(self, n, file, timings, rows):
+        with self.lock:
+            self.pending[n] = {"file": file, "rows": rows, "phases": dict(timings)}
+
+    def failed(self, n):
+        with self.lock:
+            self.pending.pop(n, None)
+
+    def written(self, n, seconds):
+        with self.lock:
+            record = self.pending.pop(n, None)
+            if record is None:
+                return
+            phases = record["phases"]
+            phases["db"] = seconds
+            total = sum(
+                v for k, v in phases.items() if k in PHASES and k != "decrypt"
+            )
+            for name, value in phases.items():
+                if name in self.values:
+                    self.values[name].append(value)
+            self.values["total"].append(total)
+            item = (total, record["file"])
+            if len(self.slowest) < self.top:
+                heapq.heappush(self.slowest, item)
+            else:
+                heapq.heappushpop(self.slowest, item)
+            self.files += 1
+            self.rows += record["rows"]
+            if self.log:
+                line = {"run": self.run_id, "n": n, **record, "total": total}
+                self.log.write(json.dumps(line, ensure_ascii=False) + "\n")
+            snapshot = self.snapshot()
+        if self.on_update:
+            self.on_update(snapshot)
+
+    def snapshot(self):
+        elapsed = time.perf_counter() - self.start
+        return {
+            "files": self.files,
+            "rows": self.rows,
+            "elapsed": elapsed,
+            "files_per_sec": self.files / elapsed if elapsed else 0.0,
+            "rows_per_sec": self.rows / elapsed if elapsed else 0.0,
+        }
+
+    def summary(self):
+        with self.lock:
+            phases = {
+                name: {
+                    "count": len(values),
+                    "p50": percentile(values, 0.5),
+                    "p95": percentile(values, 0.95),
+                    "max": max(values, default=0.0),
+                }
+                for name, values in self.values.items()
+                if values
+            }
+            slowest = [
+                {"file": file, "total": total}
+                for total, file in sorted(self.slowest, reverse=True)
+            ]
+            return {**self.snapshot(), "phases": phases, "slowest": slowest}
+
+    def close(self):
+        summary = self.summary()
+        if self.log:
+            line = {"run": self.run_id, "summary": summary}
+            self.log.write(json.dumps(line, ensure_ascii=False) + "\n")
+            self.log.close()
+            self.log = None
+        return summary
+
+
+def format_summary(summary):
+    lines = [f"{'阶段':<10}{'p50(ms)':>10}{'p95(ms)':>10}{'max(ms)':>10}"]
+    for name, p in summary["phases"].items():
+        lines.append(
+            f"{name:<12}{p['p50'] * 1000:>10.1f}{p['p95'] * 1000:>10.1f}"
+            f"{p['max'] * 1000:>10.1f}"
+        )
+    if summary["slowest"]:
+        lines.append("最慢的文件:")
+        for item in summary["slowest"]:
+            lines.append(f"  {item['total']:8.3f}s {item['file']}")
+    return "\n".join(lines)
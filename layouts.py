@@ -0,0 +1,144 @@
+import hashlib
+from dataclasses import dataclass, field
+from functools import cache
+
+import pandas as pd
+
+from workbook import EMPTY, first_value, parse_cols, range_ref
+
+
+def strip_spaces(value):
+    return str(value).replace(" ", "")
+
+
+def to_float(value):
+    # 空单元格或错误单元格记为 NaN, 不导致整个文件解析失败
+    return EMPTY if pd.isna(value) else float(value)
+
+
+@dataclass(frozen=True)
+class HeaderField:
+    """表头字段: 取区域内第一个非空单元格, 如 "F5:F6" """
+
+    name: str
+    sheet: str
+    ref: str
+    convert: object = None
+
+
+@dataclass(frozen=True)
+class Block:
+    """测量数据区域: 按表名前缀/后缀匹配的所有工作表"""
+
+    usecols: str
+    skiprows: int
+    nrows: int
+    prefix: str = ""
+    suffix: str = ""
+
+    def match(self, sheet):
+        return sheet.startswith(self.prefix) and sheet.endswith(self.suffix)
+
+
+@dataclass(frozen=True)
+class CardLayout:
+    name: str
+    category: str
+    signature: tuple  # 必须存在的工作表, 用于识别卡片类型
+    header: tuple
+    block: Block
+
+
+@dataclass
+class ReadPlan:
+    """预编译的读取计划, 每种卡片只生成一次"""
+
+    layout: CardLayout
+    cells: dict = field(default_factory=dict)  # sheet -> [(row, col)]
+    fields: list = field(default_factory=list)  # (name, [(sheet, row, col)], convert)
+    cols: list = field(default_factory=list)
+
+    def extract(self, wb):
+        values = {}
+        for sheet, coords in self.cells.items():
+            for (row, col), value in wb.cells(sheet, coords).items():
+                values[(sheet, row, col)] = value
+        header = {}
+        for name, refs, convert in self.fields:
+            if len(refs) == 1:
+                value = values[refs[0]]
+            else:
+                value = first_value([values[ref] for ref in refs])
+            header[name] = convert(value) if convert else value
+        block = self.layout.block
+        dfs = [
+            wb.frame(sheet, self.cols, block.skiprows, block.nrows)
+            for sheet in wb.sheet_names
+            if block.match(sheet)
+        ]
+        return header, dfs
+
+
+def compile_layout(layout):
+    plan = ReadPlan(layout, cols=parse_cols(layout.block.usecols))
+    for f in layout.header:
+        coords = range_ref(f.ref)
+        plan.cells.setdefault(f.sheet, []).extend(coords)
+        plan.fields.append((f.name, [(f.sheet, r, c) for r, c in coords], f.convert))
+    return plan
+
+
+LAYOUTS = [
+    CardLayout(
+        name="88",
+        category="88卡",
+        signature=("88PRES", "88-SYNTH"),
+        header=(
+            HeaderField("number", "88-SYNTH", "F5:F6"),
+            HeaderField("title", "88PRES", "G9"),
+            HeaderField("icmd", "88-SYNTH", "D28", to_float),
+            HeaderField("icmc", "88-SYNTH", "F28", to_float),
+        ),
+        block=Block("P,Q,R,V,W,X,Y,Z,AA", skiprows=9, nrows=46, prefix="RES-"),
+    ),
+    CardLayout(
+        name="32",
+        category="32卡",
+        signature=("1(32j)",),
+        header=(
+            HeaderField("number", "1(32j)", "D3:D5", strip_spaces),
+            HeaderField("title", "1(32j)", "C1"),
+            HeaderField("icmd", "1(32j)", "I23", to_float),
+            HeaderField("icmc", "1(32j)", "G23", to_float),
+        ),
+        block=Block("X,AC,AE,AG,AH,AK,AL,AM,AN", skiprows=9, nrows=64, suffix="(32i)"),
+    ),
+]
+
+PLANS = [compile_layout(layout) for layout in LAYOUTS]
+# 修改读取逻辑 (而非 LAYOUTS 定义) 时加一, 使解析缓存失效
+EXTRACT_VERSION = 2
+
+
+@cache
+def layout_version():
+    """由 LAYOUTS 定义和 EXTRACT_VERSION 生成的短版本号"""
+    parts = [str(EXTRACT_VERSION)]
+    for layout in LAYOUTS:
+        for f in layout.header:
+            # 转换函数按名称计入, repr 中的内存地址每个进程不同
+            convert = getattr(f.convert, "__name__", None)
+            parts.append(f"{layout.name}:{f.name}:{f.sheet}:{f.ref}:{convert}")
+        parts.append(
+            f"{layout.name}:{layout.category}:{layout.signature}:{layout.block}"
+        )
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=4).hexdigest()
+
+
+def detect(sheet_names):
+    """按工作表签名识别卡片类型, 不依赖文件名"""
+    names = set(sheet_names)
+    for plan in PLANS:
+        if names.issuperset(plan.layout.signature):
+            return plan
+    raise ValueError("Unsupported file type")
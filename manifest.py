@@ -0,0 +1,169 @@
+import hashlib
+import logging
+import os
+
+from sqlalchemy import text
+
+from cards import now
+
+CHUNK_SIZE = 1 << 20
+
+
+def file_hash(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def plan(conn, files, stage, force=False, on_error=None):
+    """对比清单, 返回 [(n, file, entry)] 待处理列表和 新增/变更/跳过/隔离/无法读取 计数
+
+    force 为 True 时已导入的文件也重新处理, 计为变更; 隔离的文件未变更时跳过;
+    已删除或被占用的文件经 on_error 报告后跳过, 下次运行时重新检查
+    """
+    rows = conn.execute(
+        text("select path, size, mtime, hash from manifest where stage = :stage"),
+        {"stage": stage},
+    )
+    known = {path: (size, mtime, h) for path, size, mtime, h in rows}
+    rows = conn.execute(
+        text("select path, size, mtime from quarantine where stage = :stage"),
+        {"stage": stage},
+    )
+    bad = {path: (size, mtime) for path, size, mtime in rows}
+    jobs = []
+    counts = {"new": 0, "changed": 0, "skipped": 0, "quarantined": 0, "unreadable": 0}
+    skipped = []
+
+    def unreadable(file, e):
+        counts["unreadable"] += 1
+        logging.error(f"Error reading {file}: {type(e).__name__}: {str(e)}")
+        if on_error:
+            on_error(f"{file}: {type(e).__name__}: {str(e)}")
+
+    for n, file in enumerate(files, start=1):
+        try:
+            st = os.stat(file)
+        except OSError as e:
+            unreadable(file, e)
+            continue
+        if not force and bad.get(file) == (st.st_size, st.st_mtime):
+            counts["quarantined"] += 1
+            skipped.append(n)
+            continue
+        old = known.get(file)
+        # 大小和修改时间未变时不必读取文件内容
+        if not force and old and old[0] == st.st_size and old[1] == st.st_mtime:
+            counts["skipped"] += 1
+            skipped.append(n)
+            continue
+        try:
+            h = file_hash(file)
+        except OSError as e:
+            unreadable(file, e)
+            continue
+        entry = {
+            "path": file,
+            "size": st.st_size,
+            "mtime": st.st_mtime,
+            "hash": h,
+            "old_hash": old[2] if old else None,
+        }
+        if not force and old and old[2] == h:
+            counts["skipped"] += 1
+            skipped.append(n)
+            touch(conn, stage, entry)
+            continue
+        counts["changed" if old else "new"] += 1
+        jobs.append((n, file, entry))
+    return jobs, skipped, counts
+
+
+def touch(conn, stage, entry):
+    conn.execute(
+        text(
+            "update manifest set size = :size, mtime = :mtime "
+            "where path = :path and stage = :stage"
+        ),
+        {**entry, "stage": stage},
+    )
+
+
+def replace(conn, stage, entry):
+    """删除该文件在本阶段的旧记录, 并更新清单
+
+    Total 每个文件一行, 按路径替换; 相同内容的测量值只保存一份, 由写入方插入,
+    旧内容只在清单中没有其他文件引用时删除
+    """
+    params = {
+        "path": entry["path"],
+        "stage": stage,
+        "old_hash": entry["old_hash"],
+        "hash": entry["hash"],
+    }
+    conn.execute(
+        text("delete from quarantine where path = :path and stage = :stage"),
+        params,
+    )
+    conn.execute(
+        text("delete from Total where stage = :stage and file = :path"), params
+    )
+    conn.execute(
+        text("delete from measurement where stage = :stage and file_hash = :hash"),
+        params,
+    )
+    conn.execute(
+        text(
+            "insert or replace into manifest (path, stage, size, mtime, hash, date) "
+            "values (:path, :stage, :size, :mtime, :hash, :date)"
+        ),
+        {
+            "path": entry["path"],
+            "stage": stage,
+            "size": entry["size"],
+            "mtime": entry["mtime"],
+            "hash": entry["hash"],
+            "date": now(),
+        },
+    )
+    if entry["old_hash"] and entry["old_hash"] != entry["hash"]:
+        conn.execute(
+            text(
+                "delete from measurement where stage = :stage "
+                "and file_hash = :old_hash and not exists ("
+                "select 1 from manifest where stage = :stage and hash = :old_hash)"
+            ),
+            params,
+        )
+
+
+def unreferenced(conn, stage, hashes):
+    """返回清单中本阶段已没有文件引用的哈希"""
+    rows = conn.execute(
+        text("select distinct hash from manifest where stage = :stage"),
+        {"stage": stage},
+    )
+    return set(hashes) - {h for (h,) in rows}
+
+
+def quarantine(conn, stage, entry, reason, attempts):
+    """记录无法导入的文件, 文件变更前 plan 不再处理"""
+    conn.execute(
+        text(
+            "insert or replace into quarantine "
+            "(path, stage, size, mtime, hash, reason, attempts, date) "
+            "values (:path, :stage, :size, :mtime, :hash, :reason, :attempts, :date)"
+        ),
+        {
+            "path": entry["path"],
+            "stage": stage,
+            "size": entry["size"],
+            "mtime": entry["mtime"],
+            "hash": entry["hash"],
+            "reason": reason,
+            "attempts": attempts,
+            "date": now(),
+        },
+    )
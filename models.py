@@ -0,0 +1,246 @@
+import sqlite3
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, Signal
+
+
+# 前缀筛选的上界: col >= 前缀 and col < 前缀 + MAX_CHAR, 可使用 BINARY 索引
+MAX_CHAR = "\U0010ffff"
+
+
+class PagedTableModel(QAbstractTableModel):
+    """按滚动分页读取的表格模型, 使用 keyset 分页, 排序和筛选交给 SQL
+
+    只按 sortable 中有索引的列排序, 每一页都是索引上的一次范围查找
+    """
+
+    # 查询失败时发出, 不再继续读取
+    error = Signal(str)
+
+    def __init__(
+        self,
+        conn,
+        table,
+        columns,
+        where="",
+        params=(),
+        sortable=(),
+        page_size=500,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.conn = conn
+        self.table = table
+        self.columns = columns
+        self.sortable = set(sortable)
+        self.where = where
+        self.params = list(params)
+        self.page_size = page_size
+        self.sort_column = None
+        self.descending = False
+        self.filters = {}
+        self.reset_rows()
+
+    def reset_rows(self):
+        self.rows = []
+        self.last = None  # 最后一行的 (排序值, rowid)
+        self.exhausted = False
+
+    def refresh(self):
+        self.beginResetModel()
+        self.reset_rows()
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def set_filter(self, column, value):
+        """按列前缀筛选, value 为空时取消, 条件未变时不重新查询"""
+        if self.filters.get(column, "") == value:
+            return
+        if value:
+            self.filters[column] = value
+        else:
+            self.filters.pop(column, None)
+        self.refresh()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self.rows[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section]
+        return super().headerData(section, orientation, role)
+
+    def can_sort(self, column):
+        return column < 0 or self.columns[column] in self.sortable
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # column 为 -1 时按 rowid 原始顺序; 没有索引的列不排序
+        if not self.can_sort(column):
+            return
+        self.sort_column = self.columns[column] if column >= 0 else None
+        self.descending = order == Qt.DescendingOrder
+        self.refresh()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def keyset(self):
+        """返回接在上一页之后的条件, rowid 用于区分排序值相同的行
+
+        NULL 升序在前、降序在后; 条件只在当前区间 (NULL 或非 NULL) 内查找,
+        用行值比较使 SQLite 按索引定位, 不必从头扫描
+        """
+        value, rowid = self.last
+        op = "<" if self.descending else ">"
+        if self.sort_column is None:
+            return f"rowid {op} ?", [rowid]
+        col = self.sort_column
+        if value is None:
+            return f"({col} is null and rowid {op} ?)", [rowid]
+        return f"({col}, rowid) {op} (?, ?)", [value, rowid]
+
+    def select(self, clause, values, limit):
+        clauses, params = [], []
+        if self.where:
+            clauses.append(self.where)
+            params += self.params
+        for column, value in self.filters.items():
+            # 不用 like: like 不区分大小写, 无法使用 BINARY 索引
+            clauses.append(f"{column} >= ? and {column} < ?")
+            params += [value, value + MAX_CHAR]
+        if clause:
+            clauses.append(clause)
+            params += values
+        direction = "desc" if self.descending else "asc"
+        order = f"rowid {direction}"
+        if self.sort_column is not None:
+            order = f"{self.sort_column} {direction}, {order}"
+        sql = f"select rowid, {', '.join(self.columns)} from {self.table}"
+        if clauses:
+            sql += " where " + " and ".join(clauses)
+        sql += f" order by {order} limit {limit}"
+        return self.conn.execute(sql, params).fetchall()
+
+    def fetchMore(self, parent=QModelIndex()):
+        try:
+            if self.last is None:
+                rows = self.select(None, [], self.page_size)
+            else:
+                rows = self.select(*self.keyset(), self.page_size)
+                col, in_nulls = self.sort_column, self.last[0] is None
+                rest = self.page_size - len(rows)
+                # 当前区间已取完, 接着取另一区间: 升序时 NULL 之后, 降序时非 NULL 之后
+                if rest and col is not None and in_nulls != self.descending:
+                    null = "is not null" if in_nulls else "is null"
+                    rows += self.select(f"{col} {null}", [], rest)
+        except sqlite3.Error as e:
+            self.exhausted = True
+            self.error.emit(str(e))
+            return
+        if len(rows) < self.page_size:
+            self.exhausted = True
+        if not rows:
+            return
+        sort_index = (
+            self.columns.index(self.sort_column) if self.sort_column else None
+        )
+        last = rows[-1]
+        self.last = (last[sort_index + 1] if sort_index is not None else None, last[0])
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self.rows.extend(row[1:] for row in rows)
+        self.endInsertRows()
+
+
+class ResultsModel(QAbstractTableModel):
+    """导入结果表, append 只放入缓冲区, flush 时合并为一次插入"""
+
+    HEADERS = [
+        "零件号",
+        "零件名",
+        "阶段",
+        "ICMD/ICM",
+        "ICMC/IQV",
+        "类型",
+        "导入时间",
+        "文件",
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.pending = []
+
+    def append(self, stage, summary):
+        n, file, number, title, icmd, icmc, category, time = summary
+        icmd, icmc = f"{icmd:.2%}", f"{icmc:.2%}"
+        self.pending.append(
+            (str(number), title, stage, icmd, icmc, category, time, file)
+        )
+
+    def flush(self):
+        """返回本次插入的行数"""
+        if not self.pending:
+            return 0
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(self.pending) - 1)
+        self.rows.extend(self.pending)
+        self.endInsertRows()
+        count = len(self.pending)
+        self.pending = []
+        return count
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.pending = []
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self.rows[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+
+class RowsModel(QAbstractTableModel):
+    """一次查询的全部结果, 用于零件明细等小结果集"""
+
+    def __init__(self, columns, rows, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.rows = rows
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self.rows[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section]
+        return super().headerData(section, orientation, role)
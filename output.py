@@ -0,0 +1,130 @@
+import logging
+import os
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+
+FORMATS = ["csv", "parquet", "feather"]
+FLOAT_COLUMNS = [
+    "upper_tolerance",
+    "lower_tolerance",
+    "part1",
+    "part2",
+    "part3",
+    "part4",
+]
+STRING_COLUMNS = ["name", "category", "number", "code"]
+
+
+class CsvSink:
+    """每个报告一个 CSV, 同一次运行中标题重复时追加序号"""
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.names = set()
+
+    def write(self, summary, combined_df):
+        n, title = summary[0], summary[3]
+        name = f"{title}.csv"
+        if name in self.names:
+            name = f"{title}_{n}.csv"
+            logging.warning(f"标题重复: {title}, 另存为 {name}")
+        self.names.add(name)
+        columns = [c for c in combined_df.columns if c != "file_hash"]
+        combined_df.to_csv(
+            self.output_dir / name, columns=columns, index=False, encoding="utf-8-sig"
+        )
+
+    def remove(self, stage, hashes):
+        # CSV 按标题命名, 重新导入时已覆盖
+        return 0
+
+    def close(self):
+        pass
+
+
+class ArrowSink:
+    """按 stage/part 分区的 Arrow 数据集, 每个报告一个以文件哈希命名的文件
+
+    相同内容再次导入时覆盖原文件, 内容变化后旧版本的文件由 remove 删除
+    """
+
+    name = ""
+    suffix = ""
+
+    def __init__(self, output_dir):
+        import pyarrow as pa
+
+        self.pa = pa
+        self.root = Path(output_dir) / self.name
+        self.schema = pa.schema(
+            [("no", pa.int64())]
+            + [(c, pa.string()) for c in STRING_COLUMNS]
+            + [(c, pa.float64()) for c in FLOAT_COLUMNS]
+            + [("file_hash", pa.string())]
+        )
+
+    def to_table(self, combined_df):
+        df = combined_df.drop(columns=["stage", "part"])
+        for c in FLOAT_COLUMNS:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+        for c in STRING_COLUMNS + ["file_hash"]:
+            df[c] = df[c].astype("string")
+        return self.pa.Table.from_pandas(
+            df[self.schema.names], schema=self.schema, preserve_index=False
+        )
+
+    def folder(self, stage):
+        return self.root / f"stage={quote(str(stage), safe='')}"
+
+    def write(self, summary, combined_df):
+        if combined_df.empty:
+            return
+        stage, part = combined_df["stage"].iat[0], combined_df["part"].iat[0]
+        folder = self.folder(stage) / f"part={quote(str(part), safe='')}"
+        folder.mkdir(parents=True, exist_ok=True)
+        name = f"{combined_df['file_hash'].iat[0]}{self.suffix}"
+        # 先写入以 . 开头的临时文件 (读取数据集时忽略), 再替换
+        tmp = folder / f".{name}.tmp"
+        self.dump(self.to_table(combined_df), tmp)
+        os.replace(tmp, folder / name)
+
+    def remove(self, stage, hashes):
+        """删除本阶段指定哈希的文件, 返回删除的文件数"""
+        removed = 0
+        for file_hash in hashes:
+            for path in self.folder(stage).glob(f"part=*/{file_hash}{self.suffix}"):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def close(self):
+        pass
+
+
+class ParquetSink(ArrowSink):
+    name = "parquet"
+    suffix = ".parquet"
+
+    def dump(self, table, path):
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path)
+
+
+class FeatherSink(ArrowSink):
+    name = "feather"
+    suffix = ".arrow"
+
+    def dump(self, table, path):
+        with self.pa.ipc.new_file(path, self.schema) as writer:
+            writer.write_table(table)
+
+
+def create_sink(fmt, output_dir):
+    sinks = {"csv": CsvSink, "parquet": ParquetSink, "feather": FeatherSink}
+    if fmt not in sinks:
+        raise ValueError(f"Unsupported output format: {fmt}")
+    return sinks[fmt](output_dir)
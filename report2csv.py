@@ -1,523 +1,314 @@
+import argparse
+import glob
 import logging
-import subprocess
-import pandas as pd
-from io import BytesIO
-import msoffcrypto
-import xlrd
+import queue
+import sys
+import time
+from multiprocessing import freeze_support
 from pathlib import Path
-from sqlalchemy import create_engine, Text
-from PySide6.QtGui import QIcon
-from PySide6.QtWidgets import (
-    QApplication,
-    QWidget,
-    QFileDialog,
-    QTableWidgetItem,
-    QHeaderView,
-)
-from PySide6.QtSql import QSqlDatabase, QSqlQuery, QSqlQueryModel
-from PySide6.QtCore import (
-    QObject,
-    QDateTime,
-    Signal,
-    Slot,
-    QRunnable,
-    QThreadPool,
-    Qt,
-    QMutex,
-    QMutexLocker,
-)
-from PySide6.QtUiTools import QUiLoader
 
 import config
+from instrument import format_summary
 
 STAGE_LIST = config.STAGE_LIST
-DATABASE_URL = config.DATABASE_URL
 
 
-QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+def setup_logging(log_file="log/report2csv.log"):
+    Path(log_file).parent.mkdir(exist_ok=True)
+    logging.basicConfig(
+        filename=log_file,
+        filemode="a",
+        encoding="utf-8-sig",
+        format="%(asctime)s %(message)s",
+        level=logging.DEBUG,
+    )
 
-logging.basicConfig(
-    filename="./log/report2csv.log",
-    filemode="a",
-    encoding="utf-8-sig",
-    format="%(asctime)s %(message)s",
-    level=logging.DEBUG,
-)
 
+def collect_files(source):
+    # 文件夹按原有规则递归查找, 否则按通配符匹配
+    if Path(source).is_dir():
+        return sorted(map(str, Path(source).rglob("*.xls*")))
+    return sorted(glob.glob(source, recursive=True))
 
-mutex = QMutex()
 
+def database_url(target):
+    if "://" in target:
+        # sqlite:/// URL 同样先建好数据库文件所在目录
+        if target.startswith("sqlite:///"):
+            Path(target[len("sqlite:///") :]).parent.mkdir(parents=True, exist_ok=True)
+        return target
+    Path(target).parent.mkdir(parents=True, exist_ok=True)
+    return f"sqlite:///{target}"
 
-class Signals(QObject):
-    started = Signal(int)
-    completed = Signal(tuple)
-    error = Signal(str)
 
+def run_ingest(args):
+    from ingest import ingest
 
-class Worker(QRunnable):
-    def __init__(self, n, file, stage):
-        super().__init__()
-        self.n = n
-        self.file = file
-        self.stage = stage
-        self.signals = Signals()
-        self.engine = create_engine(DATABASE_URL)
+    files = collect_files(args.source)
+    if not files:
+        print(f"未找到报告: {args.source}", file=sys.stderr)
+        return 1
+    if args.shard:
+        import shard
 
-    @Slot()
-    def run(self):
-        with QMutexLocker(mutex):
-            try:
-                self.signals.started.emit(self.n)
-                if "88" in self.file:
-                    result = self.process_88_card()
-                elif "F32" in self.file:
-                    result = self.process_32_card()
-                else:
-                    raise ValueError("Unsupported file type")
-
-                time, number, title, icmd, icmc, category = result
-                msg = (self.n, self.file, number, title, icmd, icmc, category, time)
-                self.signals.completed.emit(msg)
-            except Exception as e:
-                logging.error(f"Error processing {self.file}: {str(e)}")
-
-    def process_88_card(self):
+        index, count = args.shard
+        root = args.source if Path(args.source).is_dir() else None
+        files = shard.select(files, index, count, root)
         try:
-            with pd.ExcelFile(self.file) as xls:
-                if "88PRES" in xls.sheet_names:
-                    category = "88卡"
-                    time = QDateTime.currentDateTime().toString(
-                        "yyyy-MM-dd hh:mm:ss zzz"
-                    )
-                    df = xls.parse("88-SYNTH", header=None)
-
-                    number = df.iloc[4:6, 5].dropna().values[0]
-                    title = xls.parse("88PRES", header=None).iloc[8, 6]
-
-                    icmd = float(df.iloc[27, 3])  # 确保数值类型
-                    icmc = float(df.iloc[27, 5])
-                    dfs = [
-                        xls.parse(
-                            sheet,
-                            header=None,
-                            usecols="P,Q,R,V,W,X,Y,Z,AA",
-                            skiprows=9,
-                            nrows=46,
-                        )
-                        for sheet in xls.sheet_names
-                        if sheet.startswith("RES-")
-                    ]
-
-                    combined_df = pd.concat(dfs, ignore_index=True)
-                    combined_df.columns = [
-                        "category",
-                        "number",
-                        "code",
-                        "upper_tolerance",
-                        "lower_tolerance",
-                        "part1",
-                        "part2",
-                        "part3",
-                        "part4",
-                    ]
-                    combined_df.insert(0, "no", self.n)
-                    combined_df.insert(1, "part", number)
-                    combined_df.insert(2, "name", title)
-                    combined_df.insert(3, "stage", self.stage)
-                    combined_df.dropna(subset=["code"], inplace=True)
-
-                    # output_dir = Path("output")
-                    # output_dir.mkdir(exist_ok=True)
-                    combined_df.to_csv(
-                        f"output/{title}.csv", index=False, encoding="utf-8-sig"
-                    )
-                    total_df = pd.DataFrame(
-                        [
-                            [
-                                number,
-                                title,
-                                self.stage,
-                                icmd,
-                                icmc,
-                                category,
-                                time,
-                                self.file,
-                            ]
-                        ],
-                        columns=[
-                            "number",
-                            "title",
-                            "stage",
-                            "icmd",
-                            "icmc",
-                            "category",
-                            "date",
-                            "file",
-                        ],
-                    )
-                    with self.engine.connect() as conn:
-                        combined_df.to_sql(
-                            name=self.stage,
-                            con=conn,
-                            if_exists="append",
-                        )
-                        total_df.to_sql(
-                            name="Total", con=conn, if_exists="append", index=False
-                        )
-                    return time, number, title, icmd, icmc, category
-
-        except Exception as e:
-            logging.error(f"88卡错误: {str(e)}")
-            raise
-
-    def process_32_card(self):
-        category = "32卡"
-        time = QDateTime.currentDateTime().toString("yyyy-MM-dd hh:mm:ss zzz")
-        try:
-            with pd.ExcelFile(self.file) as xls:
-                if "1(32j)" in xls.sheet_names:
-                    df = xls.parse("1(32j)", header=None)
-                    dfs = [
-                        xls.parse(
-                            sheet,
-                            header=None,
-                            usecols="X,AC,AE,AG,AH,AK,AL,AM,AN",
-                            skiprows=9,
-                            nrows=64,
-                        )
-                        for sheet in xls.sheet_names
-                        if sheet.endswith("(32i)")
-                    ]
-        except xlrd.biffh.XLRDError:
-            decrypted = BytesIO()
-            with open(self.file, "rb") as f:
-                _file = msoffcrypto.OfficeFile(f)
-                if _file.is_encrypted():
-                    _file.load_key(password="VelvetSweatshop")
-                    _file.decrypt(decrypted)
-                    decrypted.seek(0)
-                    with pd.ExcelFile(decrypted) as xls:
-                        if "1(32j)" in xls.sheet_names:
-                            df = xls.parse("1(32j)", header=None)
-                            dfs = [
-                                xls.parse(
-                                    sheet,
-                                    header=None,
-                                    usecols="X,AC,AE,AG,AH,AK,AL,AM,AN",
-                                    skiprows=9,
-                                    nrows=64,
-                                )
-                                for sheet in xls.sheet_names
-                                if sheet.endswith("(32i)")
-                            ]
-        # except Exception as e:
-        #     logging.error(f"32卡错误: {str(e)}")
-        #     raise
-        # else:
-        number = df.iloc[2:5, 3].dropna().values[0].replace(" ", "")
-        title = df.iloc[0, 2]
-        icmd = float(df.iloc[22, 8])  # 转换为数值类型
-        icmc = float(df.iloc[22, 6])
-        combined_df = pd.concat(dfs, ignore_index=True)
-        combined_df.columns = [
-            "category",
-            "number",
-            "code",
-            "upper_tolerance",
-            "lower_tolerance",
-            "part1",
-            "part2",
-            "part3",
-            "part4",
-        ]
-        combined_df.insert(0, "no", self.n)
-        combined_df.insert(1, "part", number)
-        combined_df.insert(2, "name", title)
-        combined_df.insert(3, "stage", self.stage)
-        combined_df.dropna(subset=["code"], inplace=True)
-
-        # output_dir = Path("output")
-        # output_dir.mkdir(exist_ok=True)
-        combined_df.to_csv(f"output/{title}.csv", index=False, encoding="utf-8-sig")
-        total_df = pd.DataFrame(
-            [
-                [
-                    number,
-                    title,
-                    self.stage,
-                    icmd,
-                    icmc,
-                    category,
-                    time,
-                    self.file,
-                ]
-            ],
-            columns=[
-                "number",
-                "title",
-                "stage",
-                "icmd",
-                "icmc",
-                "category",
-                "date",
-                "file",
-            ],
-        )
-        with self.engine.connect() as conn:
-            combined_df.to_sql(name=self.stage, con=conn, if_exists="append")
-            total_df.to_sql(name="Total", con=conn, if_exists="append", index=False)
-        return time, number, title, icmd, icmc, category
-
-
-class Widget(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.setup_ui()
-        self.setup_dir()
-        self.setup_slot()
-
-    def setup_ui(self):
-        self.ui = QUiLoader().load("report2csv.ui")
-        self.ui.show()
-
-    def setup_dir(self):
-        db_dir = Path("db")
-        db_dir.mkdir(exist_ok=True)
-        log_dir = Path("log")
-        log_dir.mkdir(exist_ok=True)
-        output_dir = Path("output")
-        output_dir.mkdir(exist_ok=True)
-        csv_dir = Path("csv")
-        csv_dir.mkdir(exist_ok=True)
-        self.files = []
-        self.stage = self.ui.comboBox.currentText()
-
-    def setup_slot(self):
-        self.ui.pushButton.clicked.connect(self.get_files)
-        self.ui.pushButton_2.clicked.connect(self.start_jobs)
-        self.ui.pushButton_5.clicked.connect(self.clear_db)
-        self.ui.pushButton_6.clicked.connect(self.clear_log)
-        self.ui.pushButton_9.clicked.connect(self.model_stage)
-        self.ui.pushButton_10.clicked.connect(self.delete_db)
-        self.ui.pushButton_21.clicked.connect(self.get_folder)
-        self.ui.pushButton_11.clicked.connect(self.clear_total)
-        self.ui.pushButton_12.clicked.connect(self.model_total)
-        self.ui.pushButton_7.clicked.connect(self.setup_config)
-        self.ui.pushButton_8.clicked.connect(self.open_config)
-        self.ui.pushButton_14.clicked.connect(self.delete_output)
-        self.ui.tableView_2.doubleClicked.connect(self.query_total)
-
-    def setup_config(self):
-        self.ui.comboBox.clear()
-        self.ui.comboBox.addItems(STAGE_LIST)
-
-    def open_config(self):
-        config_file = Path("config.py")
-        if config_file.exists():
-            subprocess.Popen(["notepad.exe", str(config_file)])
-
-    def start_jobs(self):
-        if self.files:
-
-            self.restart()
-            pool = QThreadPool.globalInstance()
-            for n, file in enumerate(self.files, start=1):
-                # self.ui.textEdit.append(
-                #     f'{QDateTime.currentDateTime().toString("yyyy-MM-dd hh:mm:ss zzz")}, {file}'
-                # )
-                worker = Worker(n, file, self.stage)
-                worker.signals.completed.connect(self.complete)
-                worker.signals.started.connect(self.start)
-                pool.start(worker)
-
-    def restart(self):
-        self.ui.progressBar.setValue(0)
-        self.completed_jobs = []
-        self.ui.pushButton_2.setEnabled(False)
-        self.ui.pushButton_2.setText("运行中")
-        self.ui.pushButton_2.setStyleSheet("background-color: red;color: white")
-
-        self.ui.tableWidget.setRowCount(0)  # 清空表格
-
-    def start(self, n):
-        self.ui.listWidget.addItem(f"任务 #{n}:{Path(self.files[n-1])} 已启动...")
-        self.ui.listWidget.scrollToBottom()
-        self.ui.lineEdit.setText(f"{n}/{len(self.files)}: {Path(self.files[n-1]).name}")
-
-    def complete(self, msg):
-        n, file, number, title, icmd, icmc, category, time = msg
-        self.ui.listWidget.addItem(f"任务 #{n}:{Path(self.files[n-1])} 已完成")
-        self.completed_jobs.append(n)
-
-        row = self.ui.tableWidget.rowCount()
-        self.ui.tableWidget.insertRow(row)
-        self.ui.tableWidget.setItem(row, 0, QTableWidgetItem(str(number)))
-        self.ui.tableWidget.setItem(row, 1, QTableWidgetItem(title))
-        self.ui.tableWidget.setItem(row, 2, QTableWidgetItem(self.stage))
-        self.ui.tableWidget.setItem(row, 3, QTableWidgetItem(f"{icmd:.2%}"))
-        self.ui.tableWidget.setItem(row, 4, QTableWidgetItem(f"{icmc:.2%}"))
-        self.ui.tableWidget.setItem(row, 5, QTableWidgetItem(category))
-        self.ui.tableWidget.setItem(row, 6, QTableWidgetItem(time))
-        self.ui.tableWidget.setItem(row, 7, QTableWidgetItem(file))
-        self.ui.tableWidget.resizeColumnsToContents()
-        self.ui.tableWidget.scrollToBottom()
-
-        self.ui.progressBar.setValue(len(self.completed_jobs))
-        if len(self.completed_jobs) == len(self.files):
-            self.ui.pushButton_2.setEnabled(True)
-            self.ui.pushButton_2.setStyleSheet(
-                "background-color: rgb(0, 170, 0); color: white"
+            args.db, args.output = shard.shard_paths(
+                index, count, args.db, args.output
             )
-            self.ui.pushButton_2.setText("开始")
-
-    def clear_db(self):
-        db = QSqlDatabase.addDatabase("QSQLITE")
-        db.setDatabaseName("db/database.db")
-        if db.open():
-            self.stage = self.ui.comboBox.currentText()
-            query = QSqlQuery(db)
-            query.exec(f"DROP TABLE IF EXISTS {self.stage}")
-            # query.exec(f"DELETE FROM {self.stage}")
-            # query.exec(f"DELETE FROM sqlite_sequence WHERE name={self.stage}")
-        self.ui.lineEdit_3.setText(f"{self.stage}表已清空")
-
-    def clear_total(self):
-        db = QSqlDatabase.addDatabase("QSQLITE")
-        db.setDatabaseName("db/database.db")
-        if db.open():
-            query = QSqlQuery(db)
-            query.exec("DROP TABLE IF EXISTS 'Total'")
-        self.ui.lineEdit_3.setText("总表已清空")
-
-    def delete_db(self):
-        file_db = Path("db/database.db")
-        if file_db.exists():
-            file_db.unlink()
-        self.ui.lineEdit_3.setText("数据库已删除")
-        # self.ui.lineEdit_3.setStyleSheet("color: red")
-
-    def delete_output(self):
-        output_dir = Path("output")
-        if output_dir.exists():
-            for file in output_dir.iterdir():
-                file.unlink()
-        self.ui.lineEdit_3.setText("输出文件已删除")
-
-    def clear_log(self):
-        with open("log/report2csv.log", "w") as f:
-            f.write("")
-        self.ui.lineEdit_3.setText("日志已清空")
-
-    def get_folder(self):
-        self.stage = self.ui.comboBox.currentText()
-        _folder = QFileDialog.getExistingDirectory(
-            self,
-            "打开文件夹",
-            r"E:\Project\S32\06-零件报告\MDL",
+        except ValueError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        print(f"分片 {index}/{count}: {len(files)} 个文件, 写入 {args.db}")
+        if not files:
+            return 0
+    Path(args.output).mkdir(parents=True, exist_ok=True)
+    total = len(files)
+    errors = []
+
+    def parsed(n, file, seconds, rows):
+        print(f"[{n}/{total}] {seconds:7.3f}s {rows:6d} 行 {file}")
+
+    def failed(msg):
+        errors.append(msg)
+        print(f"失败: {msg}", file=sys.stderr)
+
+    start = time.perf_counter()
+    stats = ingest(
+        files,
+        args.stage,
+        workers=args.workers,
+        url=database_url(args.db),
+        output_dir=args.output,
+        output_format=args.format,
+        on_parsed=parsed,
+        on_error=failed,
+        force=args.force,
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"共 {total} 个文件: 新增 {stats['new']}, 变更 {stats['changed']}, "
+        f"跳过 {stats['skipped']}, 失败 {len(errors)}, "
+        f"已隔离未变更 {stats['quarantined']}"
+    )
+    print(
+        f"写入 {stats['rows']} 行, 总耗时 {elapsed:.2f} 秒, "
+        f"{stats['files'] / elapsed:.1f} 文件/秒, {stats['rows_per_sec']:.0f} 行/秒"
+    )
+    print(
+        f"解密 {stats['decrypted']} 个文件, 耗时 {stats['decrypt_seconds']:.2f} 秒, "
+        f"缓存命中 {stats['decrypt_cached']}, 淘汰 {stats['decrypt_evicted']} 个"
+    )
+    print(
+        f"解析缓存命中 {stats['cache_hits']}/{stats['cache_hits'] + stats['cache_misses']}"
+        f" ({stats['cache_hit_rate']:.0%}), 淘汰 {stats['cache_evicted']} 个"
+    )
+    if stats["mismatched"]:
+        print(f"合格率与卡片 icmd/icmc 不一致: {stats['mismatched']} 个文件, 详见日志")
+    print(format_summary(stats["timing"]))
+    return 1 if errors else 0
+
+
+def run_analyze(args):
+    import analytics
+    import schema
+    from writer import create_db_engine
+
+    with create_db_engine(database_url(args.db)).begin() as conn:
+        schema.ensure_schema(conn)
+        files, mismatched = analytics.refresh(conn)
+        summary = analytics.stage_summary(conn)
+    print(f"已分析 {files} 个文件")
+    print(f"{'阶段':<6}{'文件':>6}{'特性':>8}{'超差值':>8}{'合格率':>8}{'偏移':>10}")
+    for row in summary:
+        conformance = "-" if row.conformance is None else f"{row.conformance:.1%}"
+        drift = "-" if row.drift is None else f"{row.drift:.4f}"
+        print(
+            f"{row.stage:<8}{row.files:>8}{row.measured or 0:>10}"
+            f"{row.out_of_tolerance or 0:>10}{conformance:>10}{drift:>12}"
         )
-        self.files = list(map(str, Path(_folder).rglob("*.xls*")))
-        if self.files:
-            self.ui.progressBar.setMaximum(len(self.files))
-
-    def get_files(self):
-        self.stage = self.ui.comboBox.currentText()
-        self.files, _ = QFileDialog.getOpenFileNames(
-            self,
-            "打开文件",
-            r"E:\Project\S32\06-零件报告\MDL\外制\东实",
-            "Excel文件 (*.xls*)",
+    for row in mismatched:
+        print(
+            f"不一致: {row.stage} {row.file} 计算 {row.conformance:.2%}/"
+            f"{row.value_conformance:.2%}, 卡片 {row.icmd:.2%}/{row.icmc:.2%}"
         )
-        if self.files:
-            self.ui.progressBar.setMaximum(len(self.files))
-
-    def model_stage(self):
-        if QSqlDatabase.contains("qt_sql_default_connection"):
-            QSqlDatabase.removeDatabase("qt_sql_default_connection")
-        db = QSqlDatabase.addDatabase("QSQLITE")
-        db.setDatabaseName("db/database.db")
-        if db.open():
-            self.stage = self.ui.comboBox.currentText()
-            self.table_model = QSqlQueryModel(self)
-            self.table_model.setQuery(f"select * from {self.stage}")
-            self.ui.tableView.setModel(self.table_model)
-
-    def model_total(self):
-        if QSqlDatabase.contains("qt_sql_default_connection"):
-            QSqlDatabase.removeDatabase("qt_sql_default_connection")
-        db = QSqlDatabase.addDatabase("QSQLITE")
-        db.setDatabaseName("db/database.db")
-        if db.open():
-            self.stage = self.ui.comboBox.currentText()
-            self.total_model = QSqlQueryModel(self)
-            self.total_model.setQuery(f"select * from 'total'")
-            self.ui.tableView_2.setModel(self.total_model)
-            self.ui.tableView_2.resizeColumnsToContents()
-
-    def query_total(self):
-        row = self.ui.tableView_2.currentIndex().row()
-        number = self.ui.tableView_2.currentIndex().sibling(row, 0).data()
-        # name = self.ui.tableView_2.currentIndex().sibling(row, 1).data()
-        # data = self.ui.tableView_2.currentIndex().data()
-        # self.ui.comboBox_2.setCurrentText(name)
-        if QSqlDatabase.contains("qt_sql_default_connection"):
-            QSqlDatabase.removeDatabase("qt_sql_default_connection")
-        db = QSqlDatabase.addDatabase("QSQLITE")
-        db.setDatabaseName("db/database.db")
-        if db.open():
-            self.query_model = QSqlQueryModel(self)
-            sql = f"select number, title, stage, icmd, icmc, category from 'total' where number = '{number}'"
-            self.query_model.setQuery(sql)
-            self.ui.tableView_3.setModel(self.query_model)
-            self.ui.tableView_3.resizeColumnsToContents()
-            # self.ui.tabWidget.setCurrentIndex(3)
-
-            self.stage_model = QSqlQueryModel(self)
-
-            """
-            select
-            ET0.number || '-' || ET0.code as coder,
-            ET0.upper_tolerance,
-            ET0.lower_tolerance,
-            ET0.part1 as ET0_average,
-            ET1.part1 as ET1_average
-            from ET0
-            left join ET1 ON ET1.number || '-' || ET1.code =  ET0.number || '-' || ET0.code
-            where ET0.part = 'K300331560'
-            """
-            
-            sql = f"""
-                    select 
-                    number || '-' || code as coder, 
-                    upper_tolerance,
-                    lower_tolerance,
-                    part1 as average 
-                    from 'ET0' where part = '{number}'
-                    left join 'ET1' on 'ET0'.coder = 'ET1'.coder
-                    where 'ET1'.part = '{number}'
-                """
-            print(sql)
-            self.stage_model.setQuery(sql)
-            self.ui.tableView_4.setModel(self.stage_model)
-            self.ui.tableView_4.resizeColumnsToContents()
-        self.ui.tabWidget.setCurrentIndex(4)
-
-    def query_stage(self):
-        row = self.ui.tableView_2.currentIndex().row()
-        number = self.ui.tableView_2.currentIndex().sibling(row, 0).data()
-        if QSqlDatabase.contains("qt_sql_default_connection"):
-            QSqlDatabase.removeDatabase("qt_sql_default_connection")
-        db = QSqlDatabase.addDatabase("QSQLITE")
-        db.setDatabaseName("db/database.db")
-        if db.open():
-            self.stage_model = QSqlQueryModel(self)
-            sql = f"select number, code, part1 from {self.stage} where number = '{number}'"
-            self.query_model.setQuery(sql)
-            self.ui.tableView_4.setModel(self.stage_model)
-            self.ui.tableView_4.resizeColumnsToContents()
-        self.ui.tabWidget.setCurrentIndex(4)
+    return 0
+
+
+def run_merge(args):
+    import schema
+    import shard
+    from writer import create_db_engine
+
+    sources = sorted({f for pattern in args.shards for f in glob.glob(pattern)})
+    target = Path(args.db).resolve() if "://" not in args.db else None
+    sources = [f for f in sources if Path(f).resolve() != target]
+    if not sources:
+        print(f"未找到分片数据库: {' '.join(args.shards)}", file=sys.stderr)
+        return 1
+    for source in sources:
+        # 旧版本分片数据库先补齐表结构
+        engine = create_db_engine(database_url(source))
+        with engine.begin() as conn:
+            schema.ensure_schema(conn)
+        engine.dispose()
+    engine = create_db_engine(database_url(args.db))
+    with engine.begin() as conn:
+        schema.ensure_schema(conn)
+    with engine.connect() as conn:
+        for source in sources:
+            start = time.perf_counter()
+            stats = shard.merge(conn, source)
+            print(
+                f"{source}: 合并 {stats['files']} 个文件, 重复 {stats['duplicates']}, "
+                f"写入 {stats['rows']} 行, 耗时 {time.perf_counter() - start:.2f} 秒"
+            )
+            if stats["mismatched"]:
+                print(f"合格率与卡片 icmd/icmc 不一致: {stats['mismatched']} 个文件")
+    engine.dispose()
+    return 0
+
+
+def shard_arg(value):
+    import shard
+
+    try:
+        return shard.parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def run_watch(args):
+    from ingest import ingest
+    from watch import Watcher
+
+    folders = dict(args.folder) if args.folder else config.WATCH_FOLDERS
+    if not folders:
+        print("未配置监视文件夹: config.WATCH_FOLDERS 或 --folder", file=sys.stderr)
+        return 1
+    unknown = set(folders) - set(STAGE_LIST)
+    if unknown:
+        print(f"未知阶段: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 1
+    Path(args.output).mkdir(parents=True, exist_ok=True)
+
+    def failed(msg):
+        print(f"失败: {msg}", file=sys.stderr)
+
+    batches = queue.Queue()
+    watcher = Watcher(
+        folders, lambda stage, files: batches.put((stage, files)), args.debounce
+    )
+    watcher.start()
+    for stage, folder in folders.items():
+        print(f"监视 {stage}: {folder}")
+    try:
+        while True:
+            try:
+                # 带超时等待, Windows 上才能响应 Ctrl+C
+                stage, files = batches.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                stats = ingest(
+                    files,
+                    stage,
+                    workers=args.workers,
+                    url=database_url(args.db),
+                    output_dir=args.output,
+                    output_format=args.format,
+                    on_error=failed,
+                )
+            except Exception as e:
+                # 一批导入失败不结束监视, 文件再次变化时重新导入
+                logging.exception(f"{stage} 导入失败")
+                failed(f"{stage}: {type(e).__name__}: {str(e)}")
+                continue
+            print(
+                f"{time.strftime('%H:%M:%S')} {stage}: {len(files)} 个文件, "
+                f"新增 {stats['new']}, 变更 {stats['changed']}, "
+                f"跳过 {stats['skipped']}, 写入 {stats['rows']} 行"
+            )
+    except KeyboardInterrupt:
+        watcher.stop()
+        watcher.join()
+    return 0
+
+
+def add_output_args(p):
+    # output 依赖 pandas, 只在命令行模式下载入, 不拖慢界面启动
+    from output import FORMATS
+
+    p.add_argument("-w", "--workers", type=int, default=config.MAX_WORKERS)
+    p.add_argument("--db", default="db/database.db", help="SQLite 文件或数据库 URL")
+    p.add_argument("-o", "--output", default="output", help="输出目录")
+    p.add_argument(
+        "-f", "--format", default=config.OUTPUT_FORMAT, choices=FORMATS, help="输出格式"
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="report2csv", description="88卡/32卡报告批量导入, 不带参数时启动界面"
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("ingest", help="无界面批量导入")
+    p.add_argument("source", help="报告文件夹或通配符, 如 'MDL/**/*.xls*'")
+    p.add_argument("-s", "--stage", required=True, choices=sorted(set(STAGE_LIST)))
+    add_output_args(p)
+    p.add_argument(
+        "--force", action="store_true", help="忽略清单全部重新导出 (如更换输出格式)"
+    )
+    p.add_argument(
+        "--shard",
+        type=shard_arg,
+        metavar="I/N",
+        help="按路径哈希分为 N 片, 只导入第 I 片; 数据库和输出目录加上分片后缀",
+    )
+    p.set_defaults(func=run_ingest)
+
+    p = sub.add_parser("merge", help="把分片数据库并入主数据库, 按文件哈希去重")
+    p.add_argument("shards", nargs="+", help="分片数据库文件或通配符")
+    p.add_argument("--db", default="db/database.db", help="SQLite 文件或数据库 URL")
+    p.set_defaults(func=run_merge)
+
+    p = sub.add_parser("watch", help="监视文件夹, 新报告写完后自动导入")
+    p.add_argument(
+        "--folder",
+        nargs=2,
+        action="append",
+        metavar=("STAGE", "FOLDER"),
+        help="可重复, 默认使用 config.WATCH_FOLDERS",
+    )
+    p.add_argument(
+        "--debounce",
+        type=float,
+        default=config.WATCH_DEBOUNCE,
+        help="文件停止变化多少秒后导入",
+    )
+    add_output_args(p)
+    p.set_defaults(func=run_watch)
+
+    p = sub.add_parser("analyze", help="重算合格率、超差数和阶段偏移, 与卡片值核对")
+    p.add_argument("--db", default="db/database.db", help="SQLite 文件或数据库 URL")
+    p.set_defaults(func=run_analyze)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    setup_logging()
+    if not argv:
+        import gui
+
+        return gui.main()
+    args = build_parser().parse_args(argv)
+    return args.func(args)
 
 
 if __name__ == "__main__":
-    app = QApplication([])
-    widget = Widget()
-    app.exec()
+    freeze_support()
+    sys.exit(main())
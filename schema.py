@@ -0,0 +1,227 @@
+from sqlalchemy import inspect, text
+
+import config
+
+MEASUREMENT_COLUMNS = [
+    "no",
+    "part",
+    "name",
+    "stage",
+    "category",
+    "number",
+    "code",
+    "upper_tolerance",
+    "lower_tolerance",
+    "part1",
+    "part2",
+    "part3",
+    "part4",
+    "file_hash",
+]
+TOTAL_COLUMNS = [
+    "number",
+    "title",
+    "stage",
+    "icmd",
+    "icmc",
+    "category",
+    "date",
+    "file",
+    "file_hash",
+]
+# 由 analytics 计算的列, 不随报告导入
+ANALYTICS_COLUMNS = [
+    "measured",
+    "out_of_tolerance",
+    "conformance",
+    "value_conformance",
+    "drift",
+    "icmd_delta",
+    "icmc_delta",
+]
+# 旧版本数据库中 Total 表缺少的列
+TOTAL_ADDED_COLUMNS = {
+    "file_hash": "text",
+    "measured": "integer",
+    "out_of_tolerance": "integer",
+    "conformance": "real",
+    "value_conformance": "real",
+    "drift": "real",
+    "icmd_delta": "real",
+    "icmc_delta": "real",
+}
+# 界面分页视图可排序的列, 均有对应索引; 按其他列排序时每页都要重新排序整个表
+SORT_COLUMNS = {
+    "measurement": ["part"],
+    "Total": ["number", "stage", "date"],
+}
+
+DDL = [
+    """
+    create table if not exists parts (
+        part text primary key,
+        name text
+    )
+    """,
+    """
+    create table if not exists measurement (
+        id integer primary key,
+        no integer,
+        part text not null references parts (part),
+        name text,
+        stage text not null,
+        category text,
+        number text,
+        code text,
+        upper_tolerance real,
+        lower_tolerance real,
+        part1 real,
+        part2 real,
+        part3 real,
+        part4 real,
+        file_hash text
+    )
+    """,
+    """
+    create table if not exists Total (
+        id integer primary key,
+        number text references parts (part),
+        title text,
+        stage text,
+        icmd real,
+        icmc real,
+        category text,
+        date text,
+        file text,
+        file_hash text,
+        measured integer,
+        out_of_tolerance integer,
+        conformance real,
+        value_conformance real,
+        drift real,
+        icmd_delta real,
+        icmc_delta real
+    )
+    """,
+    """
+    create table if not exists manifest (
+        path text not null,
+        stage text not null,
+        size integer not null,
+        mtime real not null,
+        hash text not null,
+        date text,
+        primary key (path, stage)
+    )
+    """,
+    """
+    create table if not exists quarantine (
+        path text not null,
+        stage text not null,
+        size integer,
+        mtime real,
+        hash text,
+        reason text,
+        attempts integer,
+        date text,
+        primary key (path, stage)
+    )
+    """,
+    # 跨阶段对比按 part 查找, 按 (number, code) 分组, 按 stage 展开
+    "create index if not exists ix_measurement_part "
+    "on measurement (part, number, code, stage)",
+    "create index if not exists ix_measurement_stage on measurement (stage, id)",
+    "create index if not exists ix_measurement_file on measurement (file_hash)",
+    "create index if not exists ix_total_number on Total (number, stage)",
+    "create index if not exists ix_total_file on Total (file_hash)",
+    # 分页视图按 (列, rowid) 排序和按列前缀筛选, rowid 是索引的隐含末列
+    "create index if not exists ix_measurement_stage_part on measurement (stage, part)",
+    "create index if not exists ix_total_sort_number on Total (number)",
+    "create index if not exists ix_total_sort_stage on Total (stage)",
+    "create index if not exists ix_total_sort_date on Total (date)",
+]
+
+
+def stages():
+    # STAGE_LIST 中可能有重复项
+    return list(dict.fromkeys(config.STAGE_LIST))
+
+
+def ensure_schema(conn):
+    insp = inspect(conn)
+    # 旧版本由 to_sql 建的 Total 表没有 file_hash 及分析列
+    if insp.has_table("Total"):
+        columns = [c["name"] for c in insp.get_columns("Total")]
+        for column, type_ in TOTAL_ADDED_COLUMNS.items():
+            if column not in columns:
+                conn.execute(text(f'alter table "Total" add column {column} {type_}'))
+    for ddl in DDL:
+        conn.execute(text(ddl))
+    migrate_stage_tables(conn)
+
+
+def migrate_stage_tables(conn):
+    """把旧版本按阶段建的表并入 measurement"""
+    insp = inspect(conn)
+    for stage in stages():
+        if not insp.has_table(stage):
+            continue
+        existing = {c["name"] for c in insp.get_columns(stage)}
+        select = ", ".join(
+            f'"{c}"' if c in existing else "null" for c in MEASUREMENT_COLUMNS
+        )
+        conn.execute(
+            text(
+                f"insert or ignore into parts (part, name) "
+                f'select part, max(name) from "{stage}" group by part'
+            )
+        )
+        conn.execute(
+            text(
+                f"insert into measurement ({', '.join(MEASUREMENT_COLUMNS)}) "
+                f'select {select} from "{stage}"'
+            )
+        )
+        conn.execute(text(f'drop table "{stage}"'))
+    conn.execute(
+        text(
+            "insert or ignore into parts (part, name) "
+            "select number, max(title) from Total where number is not null "
+            "group by number"
+        )
+    )
+
+
+def upsert_parts(conn, rows):
+    conn.execute(
+        text(
+            "insert into parts (part, name) values (:part, :name) "
+            "on conflict (part) do update set name = excluded.name"
+        ),
+        rows,
+    )
+
+
+def pivot_sql(stage_list=None):
+    """某零件各阶段测量值并排显示, 参数为 part"""
+    columns = ",\n".join(
+        f"    max(case when stage = '{s}' then part1 end) as \"{s}\""
+        for s in stage_list or stages()
+    )
+    return (
+        "select\n"
+        "    number || '-' || code as coder,\n"
+        "    max(upper_tolerance) as upper_tolerance,\n"
+        "    max(lower_tolerance) as lower_tolerance,\n"
+        f"{columns}\n"
+        "from measurement\n"
+        "where part = ?\n"
+        "group by number, code\n"
+        "order by number, code"
+    )
+
+
+def stage_pivot(conn, part, stage_list=None):
+    """返回 (列名, 行), 走 ix_measurement_part 索引"""
+    result = conn.exec_driver_sql(pivot_sql(stage_list), (part,))
+    return list(result.keys()), result.fetchall()
@@ -0,0 +1,184 @@
+import hashlib
+import logging
+from pathlib import Path, PurePath
+
+import analytics
+import config
+import schema
+
+MERGE_TABLES = ["parts", "measurement", "Total", "manifest", "quarantine"]
+SQLITE_URL = "sqlite:///"
+
+
+def parse_shard(value):
+    """解析 "i/N" (1 <= i <= N), 供 argparse 使用"""
+    try:
+        index, count = (int(x) for x in value.split("/"))
+    except ValueError:
+        raise ValueError(f"分片格式应为 i/N: {value}") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"分片序号超出范围: {value}")
+    return index, count
+
+
+def shard_key(file, root=None):
+    # 用相对报告文件夹的路径, 各节点挂载位置或盘符不同时分片结果仍一致
+    path = PurePath(file)
+    if root is not None:
+        try:
+            path = path.relative_to(root)
+        except ValueError:
+            pass
+    return path.as_posix().lower()
+
+
+def shard_of(file, count, root=None):
+    """返回文件所属的分片序号 (1..count)"""
+    digest = hashlib.blake2b(shard_key(file, root).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+
+def select(files, index, count, root=None):
+    return [f for f in files if shard_of(f, count, root) == index]
+
+
+def shard_paths(index, count, db, output):
+    """分片默认使用各自的数据库和输出目录, 同一台机器上可同时运行
+
+    db 可以是文件路径或 sqlite:/// URL; 合并需要 attach 分片数据库, 不支持其他数据库
+    """
+    suffix = f"shard-{index}-of-{count}"
+    prefix = ""
+    if "://" in db:
+        if not db.startswith(SQLITE_URL):
+            raise ValueError(f"分片只支持 SQLite 数据库: {db}")
+        prefix, db = SQLITE_URL, db[len(SQLITE_URL) :]
+    db_path = Path(db)
+    return (
+        prefix + str(db_path.with_name(f"{db_path.stem}.{suffix}{db_path.suffix}")),
+        str(Path(output) / suffix),
+    )
+
+
+def merge(conn, shard_db):
+    """把一个分片数据库并入当前数据库, 同阶段相同文件哈希的测量值只保留一份
+
+    清单中同一路径的旧版本记录被替换; 分析列按合并后的全部阶段重算
+    返回 {"files", "duplicates", "rows", "mismatched"}
+    """
+    conn.exec_driver_sql("attach database ? as shard", (str(shard_db),))
+    try:
+        result = merge_attached(conn)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.exec_driver_sql("detach database shard")
+    return result
+
+
+def merge_attached(conn):
+    missing = [
+        t
+        for t in MERGE_TABLES
+        if not conn.exec_driver_sql(
+            "select 1 from shard.sqlite_master where type = 'table' and name = ?",
+            (t,),
+        ).first()
+    ]
+    if missing:
+        raise ValueError(f"不是分片数据库, 缺少表: {', '.join(missing)}")
+    run = conn.exec_driver_sql
+    # 分片清单中新增或内容变化的文件
+    run("drop table if exists temp.merge_files")
+    run(
+        "create temp table merge_files as "
+        "select s.path, s.stage, s.size, s.mtime, s.hash, s.date, m.hash as old_hash "
+        "from shard.manifest s left join main.manifest m "
+        "on m.path = s.path and m.stage = s.stage "
+        "where m.hash is null or m.hash != s.hash"
+    )
+    # Total 每个文件一行, 按路径替换
+    run(
+        "delete from main.Total where (stage, file) in "
+        "(select stage, path from merge_files)"
+    )
+    run(
+        "delete from main.quarantine where (path, stage) in "
+        "(select path, stage from merge_files)"
+    )
+    run(
+        "insert or replace into main.manifest (path, stage, size, mtime, hash, date) "
+        "select path, stage, size, mtime, hash, date from merge_files"
+    )
+    # 旧内容的测量值只在清单中没有其他文件引用时删除
+    run(
+        "delete from main.measurement where (stage, file_hash) in "
+        "(select stage, old_hash from merge_files f where old_hash is not null "
+        "and not exists (select 1 from main.manifest m "
+        "where m.stage = f.stage and m.hash = f.old_hash))"
+    )
+    # 其他分片或之前的导入中已有相同内容的测量值时不再复制
+    run("drop table if exists temp.merge_hashes")
+    run(
+        "create temp table merge_hashes as "
+        "select distinct stage, hash from merge_files f where not exists "
+        "(select 1 from main.measurement m "
+        "where m.stage = f.stage and m.file_hash = f.hash)"
+    )
+    files = run("select count(*) from merge_files").scalar()
+    hashes = run("select count(*) from merge_hashes").scalar()
+    run(
+        "insert into main.parts (part, name) select part, name from shard.parts "
+        "where true on conflict (part) do update set name = excluded.name"
+    )
+    # 同一内容的测量值只保留一份, 取序号最小的副本; 副本内的重复行照常保留
+    names = ", ".join(schema.MEASUREMENT_COLUMNS)
+    selected = ", ".join(f"m.{c}" for c in schema.MEASUREMENT_COLUMNS)
+    rows = run(
+        f"insert into main.measurement ({names}) select {selected} "
+        "from shard.measurement m join ("
+        "select stage, file_hash, min(no) as no from shard.measurement "
+        "where (stage, file_hash) in (select stage, hash from merge_hashes) "
+        "group by stage, file_hash) k "
+        "on m.stage = k.stage and m.file_hash = k.file_hash and m.no is k.no"
+    ).rowcount
+    names = ", ".join(schema.TOTAL_COLUMNS)
+    rows += run(
+        f"insert into main.Total ({names}) select {names} from shard.Total "
+        "where id in (select min(id) from shard.Total "
+        "where (stage, file) in (select stage, path from merge_files) "
+        "group by stage, file)"
+    ).rowcount
+    # 清单中已成功导入的文件不因分片中的隔离记录被跳过
+    run(
+        "insert or replace into main.quarantine select * from shard.quarantine s "
+        "where not exists (select 1 from main.manifest m "
+        "where m.path = s.path and m.stage = s.stage)"
+    )
+
+    parts = [
+        row[0]
+        for row in run(
+            "select distinct number from main.Total where (stage, file) in "
+            "(select stage, path from merge_files)"
+        )
+    ]
+    # 偏移与其他阶段有关, 各分片单独计算的值合并后需要重算
+    for i in range(0, len(parts), config.ANALYTICS_BATCH_PARTS):
+        analytics.analyze(conn, parts[i : i + config.ANALYTICS_BATCH_PARTS])
+    merged = [row[0] for row in run("select distinct hash from merge_files")]
+    mismatched = 0
+    for i in range(0, len(merged), config.ANALYTICS_BATCH_PARTS):
+        batch = merged[i : i + config.ANALYTICS_BATCH_PARTS]
+        mismatched += len(analytics.cross_check(conn, batch))
+    run("drop table merge_files")
+    run("drop table merge_hashes")
+    logging.info(f"合并 {files} 个文件, 重复 {files - hashes}, 写入 {rows} 行")
+    return {
+        "files": files,
+        "duplicates": files - hashes,
+        "rows": rows,
+        "mismatched": mismatched,
+    }
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+## Form generated from reading UI file 'report2csv.ui'
+##
+## Created by: Qt User Interface Compiler version 6.8.3
+##
+## WARNING! All changes made in this file will be lost when recompiling UI file!
+################################################################################
+
+from PySide6.QtCore import (QCoreApplication, QDate, QDateTime, QLocale,
+    QMetaObject, QObject, QPoint, QRect,
+    QSize, QTime, QUrl, Qt)
+from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
+    QFont, QFontDatabase, QGradient, QIcon,
+    QImage, QKeySequence, QLinearGradient, QPainter,
+    QPalette, QPixmap, QRadialGradient, QTransform)
+from PySide6.QtWidgets import (QApplication, QCheckBox, QComboBox, QGridLayout,
+    QGroupBox, QHeaderView, QLabel, QLineEdit,
+    QListWidget, QListWidgetItem, QProgressBar, QPushButton,
+    QSizePolicy, QTabWidget, QTableView, QWidget)
+
+class Ui_Form(object):
+    def setupUi(self, Form):
+        if not Form.objectName():
+            Form.setObjectName(u"Form")
+        Form.resize(800, 400)
+        sizePolicy = QSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(Form.sizePolicy().hasHeightForWidth())
+        Form.setSizePolicy(sizePolicy)
+        font = QFont()
+        font.setFamilies([u"Microsoft YaHei"])
+        Form.setFont(font)
+        icon = QIcon()
+        icon.addFile(u"icon.ico", QSize(), QIcon.Mode.Normal, QIcon.State.Off)
+        Form.setWindowIcon(icon)
+        self.gridLayout = QGridLayout(Form)
+        self.gridLayout.setObjectName(u"gridLayout")
+        self.tabWidget = QTabWidget(Form)
+        self.tabWidget.setObjectName(u"tabWidget")
+        sizePolicy1 = QSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        sizePolicy1.setHorizontalStretch(0)
+        sizePolicy1.setVerticalStretch(0)
+        sizePolicy1.setHeightForWidth(self.tabWidget.sizePolicy().hasHeightForWidth())
+        self.tabWidget.setSizePolicy(sizePolicy1)
+        self.tab = QWidget()
+        self.tab.setObjectName(u"tab")
+        sizePolicy.setHeightForWidth(self.tab.sizePolicy().hasHeightForWidth())
+        self.tab.setSizePolicy(sizePolicy)
+        self.gridLayout_2 = QGridLayout(self.tab)
+        self.gridLayout_2.setObjectName(u"gridLayout_2")
+        self.pushButton_2 = QPushButton(self.tab)
+        self.pushButton_2.setObjectName(u"pushButton_2")
+        self.pushButton_2.setFont(font)
+        self.pushButton_2.setStyleSheet(u"background-color: rgb(0, 170, 0);\n"
+"color: rgb(255, 255, 255);")
+
+        self.gridLayout_2.addWidget(self.pushButton_2, 0, 4, 1, 1)
+
+        self.pushButton_21 = QPushButton(self.tab)
+        self.pushButton_21.setObjectName(u"pushButton_21")
+        self.pushButton_21.setFont(font)
+        self.pushButton_21.setStyleSheet(u"background-color: rgb(13, 110, 253);\n"
+"color: rgb(255, 255, 255);")
+
+        self.gridLayout_2.addWidget(self.pushButton_21, 0, 2, 1, 1)
+
+        self.progressBar = QProgressBar(self.tab)
+        self.progressBar.setObjectName(u"progressBar")
+        self.progressBar.setValue(0)
+        self.progressBar.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        self.gridLayout_2.addWidget(self.progressBar, 5, 0, 1, 5)
+
+        self.tableView_5 = QTableView(self.tab)
+        self.tableView_5.setObjectName(u"tableView_5")
+        self.tableView_5.setFont(font)
+
+        self.gridLayout_2.addWidget(self.tableView_5, 4, 0, 1, 5)
+
+        self.pushButton = QPushButton(self.tab)
+        self.pushButton.setObjectName(u"pushButton")
+        self.pushButton.setFont(font)
+        self.pushButton.setStyleSheet(u"background-color: rgb(13, 110, 253);\n"
+"color: rgb(255, 255, 255);")
+
+        self.gridLayout_2.addWidget(self.pushButton, 0, 1, 1, 1)
+
+        self.lineEdit = QLineEdit(self.tab)
+        self.lineEdit.setObjectName(u"lineEdit")
+        self.lineEdit.setReadOnly(True)
+
+        self.gridLayout_2.addWidget(self.lineEdit, 0, 3, 1, 1)
+
+        self.checkBox = QCheckBox(self.tab)
+        self.checkBox.setObjectName(u"checkBox")
+        self.checkBox.setFont(font)
+
+        self.gridLayout_2.addWidget(self.checkBox, 0, 0, 1, 1)
+
+        self.tabWidget.addTab(self.tab, "")
+        self.tab_5 = QWidget()
+        self.tab_5.setObjectName(u"tab_5")
+        self.gridLayout_8 = QGridLayout(self.tab_5)
+        self.gridLayout_8.setObjectName(u"gridLayout_8")
+        self.pushButton_12 = QPushButton(self.tab_5)
+        self.pushButton_12.setObjectName(u"pushButton_12")
+        self.pushButton_12.setFont(font)
+        self.pushButton_12.setStyleSheet(u"background-color: rgb(13, 110, 253);\n"
+"color: rgb(255, 255, 255);")
+
+        self.gridLayout_8.addWidget(self.pushButton_12, 0, 0, 1, 1)
+
+        self.lineEdit_5 = QLineEdit(self.tab_5)
+        self.lineEdit_5.setObjectName(u"lineEdit_5")
+
+        self.gridLayout_8.addWidget(self.lineEdit_5, 0, 1, 1, 1)
+
+        self.tableView_2 = QTableView(self.tab_5)
+        self.tableView_2.setObjectName(u"tableView_2")
+
+        self.gridLayout_8.addWidget(self.tableView_2, 1, 0, 1, 2)
+
+        self.tabWidget.addTab(self.tab_5, "")
+        self.tab_4 = QWidget()
+        self.tab_4.setObjectName(u"tab_4")
+        self.gridLayout_6 = QGridLayout(self.tab_4)
+        self.gridLayout_6.setObjectName(u"gridLayout_6")
+        self.pushButton_9 = QPushButton(self.tab_4)
+        self.pushButton_9.setObjectName(u"pushButton_9")
+        self.pushButton_9.setFont(font)
+        self.pushButton_9.setStyleSheet(u"background-color: rgb(13, 110, 253);\n"
+"color: rgb(255, 255, 255);")
+
+        self.gridLayout_6.addWidget(self.pushButton_9, 0, 0, 1, 1)
+
+        self.lineEdit_6 = QLineEdit(self.tab_4)
+        self.lineEdit_6.setObjectName(u"lineEdit_6")
+
+        self.gridLayout_6.addWidget(self.lineEdit_6, 0, 1, 1, 1)
+
+        self.tableView = QTableView(self.tab_4)
+        self.tableView.setObjectName(u"tableView")
+
+        self.gridLayout_6.addWidget(self.tableView, 1, 0, 1, 2)
+
+        self.tabWidget.addTab(self.tab_4, "")
+        self.tab_6 = QWidget()
+        self.tab_6.setObjectName(u"tab_6")
+        self.gridLayout_9 = QGridLayout(self.tab_6)
+        self.gridLayout_9.setObjectName(u"gridLayout_9")
+        self.comboBox_2 = QComboBox(self.tab_6)
+        self.comboBox_2.setObjectName(u"comboBox_2")
+        self.comboBox_2.setStyleSheet(u"")
+
+        self.gridLayout_9.addWidget(self.comboBox_2, 0, 0, 1, 1)
+
+        self.pushButton_13 = QPushButton(self.tab_6)
+        self.pushButton_13.setObjectName(u"pushButton_13")
+        self.pushButton_13.setFont(font)
+        self.pushButton_13.setStyleSheet(u"background-color: rgb(13, 110, 253);\n"
+"color: rgb(255, 255, 255);")
+
+        self.gridLayout_9.addWidget(self.pushButton_13, 0, 1, 1, 1)
+
+        self.tableView_3 = QTableView(self.tab_6)
+        self.tableView_3.setObjectName(u"tableView_3")
+
+        self.gridLayout_9.addWidget(self.tableView_3, 1, 0, 1, 2)
+
+        self.tabWidget.addTab(self.tab_6, "")
+        self.tab_2 = QWidget()
+        self.tab_2.setObjectName(u"tab_2")
+        self.gridLayout_3 = QGridLayout(self.tab_2)
+        self.gridLayout_3.setObjectName(u"gridLayout_3")
+        self.pushButton_4 = QPushButton(self.tab_2)
+        self.pushButton_4.setObjectName(u"pushButton_4")
+        self.pushButton_4.setFont(font)
+        self.pushButton_4.setStyleSheet(u"background-color: rgb(13, 110, 253);\n"
+"color: rgb(255, 255, 255);")
+
+        self.gridLayout_3.addWidget(self.pushButton_4, 0, 0, 1, 1)
+
+        self.lineEdit_2 = QLineEdit(self.tab_2)
+        self.lineEdit_2.setObjectName(u"lineEdit_2")
+
+        self.gridLayout_3.addWidget(self.lineEdit_2, 0, 1, 1, 1)
+
+        self.pushButton_3 = QPushButton(self.tab_2)
+        self.pushButton_3.setObjectName(u"pushButton_3")
+        self.pushButton_3.setFont(font)
+        self.pushButton_3.setStyleSheet(u"background-color: rgb(0, 170, 0);\n"
+"color: rgb(255, 255, 255);")
+
+        self.gridLayout_3.addWidget(self.pushButton_3, 0, 2, 1, 1)
+
+        self.tableView_4 = QTableView(self.tab_2)
+        self.tableView_4.setObjectName(u"tableView_4")
+
+        self.gridLayout_3.addWidget(self.tableView_4, 1, 0, 1, 3)
+
+        self.tabWidget.addTab(self.tab_2, "")
+        self.tab_3 = QWidget()
+        self.tab_3.setObjectName(u"tab_3")
+        self.gridLayout_7 = QGridLayout(self.tab_3)
+        self.gridLayout_7.setObjectName(u"gridLayout_7")
+        self.groupBox_4 = QGroupBox(self.tab_3)
+        self.groupBox_4.setObjectName(u"groupBox_4")
+        self.gridLayout_5 = QGridLayout(self.groupBox_4)
+        self.gridLayout_5.setObjectName(u"gridLayout_5")
+        self.pushButton_7 = QPushButton(self.groupBox_4)
+        self.pushButton_7.setObjectName(u"pushButton_7")
+        self.pushButton_7.setStyleSheet(u"")
+
+        self.gridLayout_5.addWidget(self.pushButton_7, 2, 0, 1, 1)
+
+        self.pushButton_6 = QPushButton(self.groupBox_4)
+        self.pushButton_6.setObjectName(u"pushButton_6")
+        self.pushButton_6.setStyleSheet(u"")
+
+        self.gridLayout_5.addWidget(self.pushButton_6, 3, 0, 1, 1)
+
+        self.lineEdit_4 = QLineEdit(self.groupBox_4)
+        self.lineEdit_4.setObjectName(u"lineEdit_4")
+
+        self.gridLayout_5.addWidget(self.lineEdit_4, 7, 0, 1, 1)
+
+        self.label = QLabel(self.groupBox_4)
+        self.label.setObjectName(u"label")
+        self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        self.gridLayout_5.addWidget(self.label, 0, 0, 1, 1)
+
+        self.pushButton_8 = QPushButton(self.groupBox_4)
+        self.pushButton_8.setObjectName(u"pushButton_8")
+        self.pushButton_8.setStyleSheet(u"")
+
+        self.gridLayout_5.addWidget(self.pushButton_8, 4, 0, 1, 1)
+
+        self.comboBox = QComboBox(self.groupBox_4)
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.setObjectName(u"comboBox")
+
+        self.gridLayout_5.addWidget(self.comboBox, 1, 0, 1, 1)
+
+
+        self.gridLayout_7.addWidget(self.groupBox_4, 0, 0, 1, 1)
+
+        self.groupBox_3 = QGroupBox(self.tab_3)
+        self.groupBox_3.setObjectName(u"groupBox_3")
+        self.gridLayout_4 = QGridLayout(self.groupBox_3)
+        self.gridLayout_4.setObjectName(u"gridLayout_4")
+        self.lineEdit_3 = QLineEdit(self.groupBox_3)
+        self.lineEdit_3.setObjectName(u"lineEdit_3")
+
+        self.gridLayout_4.addWidget(self.lineEdit_3, 5, 0, 1, 1)
+
+        self.pushButton_11 = QPushButton(self.groupBox_3)
+        self.pushButton_11.setObjectName(u"pushButton_11")
+        font1 = QFont()
+        font1.setFamilies([u"Microsoft YaHei"])
+        font1.setBold(True)
+        self.pushButton_11.setFont(font1)
+        self.pushButton_11.setStyleSheet(u"background-color: rgb(220, 53, 69);\n"
+"color: rgb(255, 255, 255);")
+
+        self.gridLayout_4.addWidget(self.pushButton_11, 3, 0, 1, 1)
+
+        self.pushButton_5 = QPushButton(self.groupBox_3)
+        self.pushButton_5.setObjectName(u"pushButton_5")
+        self.pushButton_5.setFont(font1)
+        self.pushButton_5.setStyleSheet(u"background-color: rgb(220, 53, 69);\n"
+"color: rgb(255, 255, 255);")
+
+        self.gridLayout_4.addWidget(self.pushButton_5, 4, 0, 1, 1)
+
+        self.pushButton_10 = QPushButton(self.groupBox_3)
+        self.pushButton_10.setObjectName(u"pushButton_10")
+        self.pushButton_10.setFont(font1)
+        self.pushButton_10.setStyleSheet(u"background-color: rgb(220, 53, 69);\n"
+"color: rgb(255, 255, 255);")
+
+        self.gridLayout_4.addWidget(self.pushButton_10, 2, 0, 1, 1)
+
+        self.label_2 = QLabel(self.groupBox_3)
+        self.label_2.setObjectName(u"label_2")
+        self.label_2.setStyleSheet(u"font: 9pt \"Microsoft YaHei\";\n"
+"color: rgb(255, 0, 0);")
+        self.label_2.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        self.gridLayout_4.addWidget(self.label_2, 0, 0, 1, 1)
+
+        self.pushButton_14 = QPushButton(self.groupBox_3)
+        self.pushButton_14.setObjectName(u"pushButton_14")
+        self.pushButton_14.setFont(font1)
+        self.pushButton_14.setStyleSheet(u"background-color: rgb(13, 202, 240);\n"
+"color: rgb(255, 255, 255);")
+
+        self.gridLayout_4.addWidget(self.pushButton_14, 1, 0, 1, 1)
+
+
+        self.gridLayout_7.addWidget(self.groupBox_3, 0, 1, 1, 1)
+
+        self.listWidget = QListWidget(self.tab_3)
+        self.listWidget.setObjectName(u"listWidget")
+
+        self.gridLayout_7.addWidget(self.listWidget, 1, 0, 1, 2)
+
+        self.tabWidget.addTab(self.tab_3, "")
+
+        self.gridLayout.addWidget(self.tabWidget, 1, 0, 1, 1)
+
+
+        self.retranslateUi(Form)
+
+        self.tabWidget.setCurrentIndex(1)
+
+
+        QMetaObject.connectSlotsByName(Form)
+    # setupUi
+
+    def retranslateUi(self, Form):
+        Form.setWindowTitle(QCoreApplication.translate("Form", u"Report2csv 0.0.1", None))
+        self.pushButton_2.setText(QCoreApplication.translate("Form", u"\u5f00\u59cb", None))
+        self.pushButton_21.setText(QCoreApplication.translate("Form", u"\u5bfc\u5165\u8def\u5f84", None))
+        self.pushButton.setText(QCoreApplication.translate("Form", u"\u5bfc\u5165\u62a5\u544a", None))
+#if QT_CONFIG(tooltip)
+        self.checkBox.setToolTip(QCoreApplication.translate("Form", u"\u76d1\u89c6\u6587\u4ef6\u5939, \u65b0\u62a5\u544a\u5199\u5b8c\u540e\u81ea\u52a8\u5bfc\u5165", None))
+#endif // QT_CONFIG(tooltip)
+        self.checkBox.setText(QCoreApplication.translate("Form", u"\u76d1\u89c6", None))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab), QCoreApplication.translate("Form", u"\u5bfc\u5165", None))
+        self.pushButton_12.setText(QCoreApplication.translate("Form", u"\u67e5\u770b\u6c47\u603b", None))
+        self.lineEdit_5.setPlaceholderText(QCoreApplication.translate("Form", u"\u96f6\u4ef6\u53f7\u7b5b\u9009, \u56de\u8f66\u5e94\u7528", None))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_5), QCoreApplication.translate("Form", u"\u6c47\u603b", None))
+        self.pushButton_9.setText(QCoreApplication.translate("Form", u"\u67e5\u770b\u9636\u6bb5", None))
+        self.lineEdit_6.setPlaceholderText(QCoreApplication.translate("Form", u"\u96f6\u4ef6\u53f7\u7b5b\u9009, \u56de\u8f66\u5e94\u7528", None))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_4), QCoreApplication.translate("Form", u"\u9636\u6bb5", None))
+        self.pushButton_13.setText(QCoreApplication.translate("Form", u"\u67e5\u770b\u6570\u636e", None))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_6), QCoreApplication.translate("Form", u"\u6570\u636e", None))
+        self.pushButton_4.setText(QCoreApplication.translate("Form", u"\u9009\u62e9\u8def\u5f84", None))
+        self.pushButton_3.setText(QCoreApplication.translate("Form", u"\u5bfc\u51fa", None))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_2), QCoreApplication.translate("Form", u"\u5bfc\u51fa", None))
+        self.groupBox_4.setTitle(QCoreApplication.translate("Form", u"\u521d\u59cb\u5316\u8bbe\u7f6e", None))
+        self.pushButton_7.setText(QCoreApplication.translate("Form", u"\u8bbe\u7f6e\u9636\u6bb5\u540d", None))
+        self.pushButton_6.setText(QCoreApplication.translate("Form", u"\u6e05\u7a7a\u65e5\u5fd7", None))
+        self.label.setText(QCoreApplication.translate("Form", u"\u6307\u5b9aSqlite3\u672c\u5730\u6570\u636e\u5e93\u8def\u5f84\n"
+"\u9ed8\u8ba4\u4e3a\u5f53\u524d\u8def\u5f84dbdatabase.db", None))
+        self.pushButton_8.setText(QCoreApplication.translate("Form", u"\u6253\u5f00\u8bbe\u7f6e\u6587\u4ef6", None))
+        self.comboBox.setItemText(0, QCoreApplication.translate("Form", u"ET0", None))
+        self.comboBox.setItemText(1, QCoreApplication.translate("Form", u"ET1", None))
+        self.comboBox.setItemText(2, QCoreApplication.translate("Form", u"ET2", None))
+        self.comboBox.setItemText(3, QCoreApplication.translate("Form", u"ET3", None))
+        self.comboBox.setItemText(4, QCoreApplication.translate("Form", u"PT1", None))
+        self.comboBox.setItemText(5, QCoreApplication.translate("Form", u"PT2", None))
+        self.comboBox.setItemText(6, QCoreApplication.translate("Form", u"MDL", None))
+        self.comboBox.setItemText(7, QCoreApplication.translate("Form", u"SOP", None))
+
+        self.groupBox_3.setTitle(QCoreApplication.translate("Form", u"\u5220\u9664\u6570\u636e\u8868", None))
+        self.pushButton_11.setText(QCoreApplication.translate("Form", u"\u6e05\u7a7a\u6c47\u603b\u8868", None))
+        self.pushButton_5.setText(QCoreApplication.translate("Form", u"\u6e05\u7a7a\u9636\u6bb5\u8868", None))
+        self.pushButton_10.setText(QCoreApplication.translate("Form", u"\u5220\u9664\u6570\u636e\u5e93", None))
+        self.label_2.setText(QCoreApplication.translate("Form", u"\u5220\u9664\u6307\u5b9a\u6570\u636e\u8868\n"
+"\u8c28\u614e\u64cd\u4f5c\uff01", None))
+        self.pushButton_14.setText(QCoreApplication.translate("Form", u"\u6e05\u7a7a\u8f93\u51fa\u6587\u4ef6", None))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_3), QCoreApplication.translate("Form", u"\u8bbe\u7f6e", None))
+    # retranslateUi
+
@@ -0,0 +1,175 @@
+import logging
+import os
+import threading
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+
+import config
+
+# 检查待处理文件的间隔 (秒)
+TICK = 0.5
+# 表示文件内容可能变化的 watchdog 事件
+WRITE_EVENTS = ("created", "modified", "moved", "closed")
+
+
+def is_report(path):
+    # 与 rglob("*.xls*") 一致, 跳过 Excel 打开文件时生成的 ~$ 锁文件
+    name = os.path.basename(path)
+    return fnmatch(name.lower(), "*.xls*") and not name.startswith("~$")
+
+
+def scan_folder(folder):
+    """递归列出报告的 (大小, 修改时间), 用 scandir 避免逐个 stat"""
+    found = {}
+    stack = [str(folder)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif is_report(entry.name):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    found[entry.path] = (st.st_size, st.st_mtime)
+    return found
+
+
+class EventHandler:
+    """watchdog 事件处理, 只需提供 dispatch, 不必继承 FileSystemEventHandler"""
+
+    def __init__(self, watcher, stage):
+        self.watcher = watcher
+        self.stage = stage
+
+    def dispatch(self, event):
+        # 忽略 opened/closed_no_write 等只读事件, 否则导入时读取文件会再次触发
+        if event.is_directory or event.event_type not in WRITE_EVENTS:
+            return
+        path = getattr(event, "dest_path", "") or event.src_path
+        if is_report(path):
+            self.watcher.notice(self.stage, path)
+
+
+class Watcher(threading.Thread):
+    """监视各阶段文件夹, 新增或修改的报告写入完成后按阶段分批交给 on_batch
+
+    有 watchdog 时使用系统通知 (Linux 为 inotify), 否则定时扫描;
+    文件在 debounce 秒内大小和修改时间不变且可以打开, 才认为已写完
+    """
+
+    def __init__(
+        self, folders, on_batch, debounce=None, poll_interval=None, initial_scan=True
+    ):
+        super().__init__(daemon=True)
+        self.folders = {stage: Path(folder) for stage, folder in folders.items()}
+        self.on_batch = on_batch
+        self.debounce = config.WATCH_DEBOUNCE if debounce is None else debounce
+        self.poll_interval = poll_interval or config.WATCH_POLL_INTERVAL
+        self.initial_scan = initial_scan
+        self.pending = {}  # path -> (stage, 最后变化时间, (大小, 修改时间))
+        self.emitted = {}  # path -> 上次交出时的 (大小, 修改时间)
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.observer = None
+
+    def notice(self, stage, path):
+        with self.lock:
+            self.pending[str(path)] = (stage, time.monotonic(), None)
+
+    def stop(self):
+        self.stopped.set()
+
+    def start_observer(self):
+        if config.WATCH_POLLING:
+            return None
+        try:
+            from watchdog.observers import Observer
+        except ImportError:
+            logging.info("未安装 watchdog, 改为定时扫描")
+            return None
+        observer = Observer()
+        try:
+            for stage, folder in self.folders.items():
+                handler = EventHandler(self, stage)
+                observer.schedule(handler, str(folder), recursive=True)
+            observer.start()
+        except OSError as e:
+            # 如 inotify 监视数达到上限, 或网络共享不支持通知
+            logging.warning(f"文件夹监视启动失败, 改为定时扫描: {str(e)}")
+            return None
+        return observer
+
+    def scan(self):
+        return {
+            path: (stage, sig)
+            for stage, folder in self.folders.items()
+            for path, sig in scan_folder(folder).items()
+        }
+
+    def poll(self, known):
+        current = self.scan()
+        for path, (stage, sig) in current.items():
+            if known.get(path, (None, None))[1] != sig:
+                self.notice(stage, path)
+        return current
+
+    def ready(self):
+        """返回 {stage: [文件]}, 只包含已稳定的文件"""
+        now = time.monotonic()
+        batches = {}
+        with self.lock:
+            for path, (stage, changed, sig) in list(self.pending.items()):
+                if now - changed < self.debounce:
+                    continue
+                try:
+                    st = os.stat(path)
+                    # Windows 上仍在复制的文件无法打开
+                    with open(path, "rb"):
+                        pass
+                except FileNotFoundError:
+                    del self.pending[path]
+                    continue
+                except OSError:
+                    self.pending[path] = (stage, now, None)
+                    continue
+                current = (st.st_size, st.st_mtime)
+                if current != sig:
+                    # 再等一个 debounce 周期确认没有继续写入
+                    self.pending[path] = (stage, now, current)
+                    continue
+                del self.pending[path]
+                # 读取文件更新访问时间也会产生 modified 事件, 内容未变时不再交出
+                if self.emitted.get(path) == current:
+                    continue
+                self.emitted[path] = current
+                batches.setdefault(stage, []).append(path)
+        return {stage: sorted(files) for stage, files in batches.items()}
+
+    def run(self):
+        self.observer = self.start_observer()
+        known = self.scan() if self.observer is None or self.initial_scan else {}
+        if self.initial_scan:
+            # 启动前已有的文件交给清单判断是否需要导入
+            for path, (stage, _) in known.items():
+                self.notice(stage, path)
+        logging.info(
+            f"开始监视 {len(self.folders)} 个文件夹, "
+            f"{'系统通知' if self.observer else '定时扫描'}"
+        )
+        next_poll = time.monotonic() + self.poll_interval
+        while not self.stopped.wait(TICK):
+            if self.observer is None and time.monotonic() >= next_poll:
+                known = self.poll(known)
+                next_poll = time.monotonic() + self.poll_interval
+            for stage, files in self.ready().items():
+                self.on_batch(stage, files)
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
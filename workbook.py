@@ -0,0 +1,226 @@
+import logging
+from datetime import date, datetime
+from io import BytesIO
+
+import pandas as pd
+import xlrd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+import config
+
+ZIP_MAGIC = b"PK\x03\x04"
+# 空单元格和错误单元格 (#N/A, #DIV/0! 等), 与 pandas 读取时一致为 NaN
+EMPTY = float("nan")
+
+
+def col_index(letters):
+    # "A" -> 0, "AA" -> 26
+    n = 0
+    for ch in letters.strip().upper():
+        n = n * 26 + ord(ch) - ord("A") + 1
+    return n - 1
+
+
+def parse_cols(usecols):
+    return [col_index(c) for c in usecols.split(",")]
+
+
+def cell_ref(ref):
+    # "F28" -> (27, 5)
+    letters = ref.rstrip("0123456789")
+    return int(ref[len(letters):]) - 1, col_index(letters)
+
+
+def range_ref(ref):
+    # "D3:D5" -> [(2, 3), (3, 3), (4, 3)]
+    first, _, last = ref.partition(":")
+    top, left = cell_ref(first)
+    bottom, right = cell_ref(last) if last else (top, left)
+    return [
+        (r, c) for r in range(top, bottom + 1) for c in range(left, right + 1)
+    ]
+
+
+def first_value(values):
+    # 等价于 Series.dropna().values[0]
+    for v in values:
+        if v is not None and not pd.isna(v):
+            return v
+    raise IndexError("no value in cells")
+
+
+class Workbook:
+    """只读取需要的单元格和区域, 不构建整表 DataFrame"""
+
+    def __init__(self, source, backends=None):
+        if isinstance(source, str) or hasattr(source, "__fspath__"):
+            with open(source, "rb") as f:
+                magic = f.read(8)
+        else:
+            magic = source.read(8)
+            source.seek(0)
+        # 按文件内容而非扩展名判断格式, 报告的扩展名不一定可靠
+        kind = "xlsx" if magic.startswith(ZIP_MAGIC) else "xls"
+        self.backend, self.reader = open_reader(
+            source, backends or config.READER_BACKENDS[kind]
+        )
+        self.sheet_names = self.reader.sheet_names
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.reader.close()
+
+    def cells(self, sheet, coords):
+        """读取若干 0 基 (row, col) 单元格, 返回 {(row, col): value}"""
+        rows = [r for r, _ in coords]
+        cols = [c for _, c in coords]
+        top, left = min(rows), min(cols)
+        grid = self.reader.block(sheet, top, max(rows) + 1, left, max(cols) + 1)
+        values = {}
+        for r, c in coords:
+            row = grid[r - top] if r - top < len(grid) else []
+            values[(r, c)] = row[c - left] if c - left < len(row) else EMPTY
+        return values
+
+    def cell(self, sheet, row, col):
+        return self.cells(sheet, [(row, col)])[(row, col)]
+
+    def frame(self, sheet, usecols, skiprows, nrows):
+        """等价于 parse(sheet, header=None, usecols=..., skiprows=..., nrows=...)"""
+        cols = parse_cols(usecols) if isinstance(usecols, str) else usecols
+        grid = self.reader.block(
+            sheet, skiprows, skiprows + nrows, min(cols), max(cols) + 1
+        )
+        left = min(cols)
+        rows = [
+            [row[c - left] if c - left < len(row) else EMPTY for c in cols]
+            for row in grid
+        ]
+        return pd.DataFrame(rows, columns=range(len(cols)))
+
+
+def open_reader(source, backends):
+    """按顺序尝试各后端, 未安装或打开失败时换下一个, 返回 (名称, reader)"""
+    error = None
+    for name in backends:
+        try:
+            return name, READERS[name](source)
+        except ImportError:
+            logging.debug(f"读取后端 {name} 未安装")
+        except Exception as e:
+            logging.warning(f"读取后端 {name} 打开失败, 改用下一个: {str(e)}")
+            error = e
+        if isinstance(source, BytesIO):
+            source.seek(0)
+    raise error or ValueError(f"没有可用的读取后端: {backends}")
+
+
+class CalamineReader:
+    """Rust 实现的 calamine, xls 和 xlsx 均可读取, 需安装 python-calamine"""
+
+    def __init__(self, source):
+        from python_calamine import CalamineWorkbook
+
+        if isinstance(source, BytesIO):
+            self.book = CalamineWorkbook.from_filelike(source)
+        else:
+            self.book = CalamineWorkbook.from_path(str(source))
+        self.sheet_names = self.book.sheet_names
+
+    def close(self):
+        self.book.close()
+
+    @staticmethod
+    def value(value):
+        # 与 pandas 的 calamine 读取方式保持一致, 空单元格和错误单元格为 ""
+        if value == "":
+            return EMPTY
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, date) and not isinstance(value, datetime):
+            return datetime(value.year, value.month, value.day)
+        return value
+
+    def block(self, sheet, top, bottom, left, right):
+        ws = self.book.get_sheet_by_name(sheet)
+        # 不跳过左上角空白区域, 使行列号与单元格地址一致
+        rows = ws.to_python(skip_empty_area=False, nrows=bottom)
+        return [[self.value(v) for v in row[left:right]] for row in rows[top:bottom]]
+
+
+class XlrdReader:
+    def __init__(self, source):
+        if isinstance(source, BytesIO):
+            self.book = xlrd.open_workbook(
+                file_contents=source.getvalue(), on_demand=True
+            )
+        else:
+            self.book = xlrd.open_workbook(source, on_demand=True)
+        self.sheet_names = self.book.sheet_names()
+
+    def close(self):
+        self.book.release_resources()
+
+    def value(self, cell):
+        # 与 pandas 的 xlrd 读取方式保持一致
+        if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+            return EMPTY
+        if cell.ctype == xlrd.XL_CELL_NUMBER:
+            return int(cell.value) if cell.value.is_integer() else cell.value
+        if cell.ctype == xlrd.XL_CELL_DATE:
+            return xlrd.xldate.xldate_as_datetime(cell.value, self.book.datemode)
+        if cell.ctype == xlrd.XL_CELL_BOOLEAN:
+            return bool(cell.value)
+        return cell.value
+
+    def block(self, sheet, top, bottom, left, right):
+        ws = self.book.sheet_by_name(sheet)
+        grid = []
+        for r in range(top, min(bottom, ws.nrows)):
+            row = ws.row_slice(r, left, min(right, ws.ncols))
+            grid.append([self.value(cell) for cell in row])
+        self.book.unload_sheet(sheet)
+        return grid
+
+
+class OpenpyxlReader:
+    def __init__(self, source):
+        self.book = load_workbook(source, read_only=True, data_only=True)
+        self.sheet_names = self.book.sheetnames
+
+    def close(self):
+        self.book.close()
+
+    @staticmethod
+    def value(cell):
+        # 与 pandas 的 openpyxl 读取方式保持一致, values_only 会把错误值读成字符串
+        if cell.value is None or cell.data_type == TYPE_ERROR:
+            return EMPTY
+        if cell.data_type == TYPE_NUMERIC and float(cell.value).is_integer():
+            return int(cell.value)
+        return cell.value
+
+    def block(self, sheet, top, bottom, left, right):
+        ws = self.book[sheet]
+        return [
+            [self.value(cell) for cell in row]
+            for row in ws.iter_rows(
+                min_row=top + 1,
+                max_row=bottom,
+                min_col=left + 1,
+                max_col=right,
+            )
+        ]
+
+
+READERS = {
+    "calamine": CalamineReader,
+    "openpyxl": OpenpyxlReader,
+    "xlrd": XlrdReader,
+}
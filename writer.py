@@ -0,0 +1,149 @@
+import logging
+import queue
+import threading
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine, event
+
+import analytics
+import config
+import manifest
+import schema
+
+_STOP = object()
+
+
+def create_db_engine(url=None):
+    # 单写入线程只需要一个常驻连接
+    engine = create_engine(url or config.DATABASE_URL, pool_size=1, max_overflow=0)
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_conn, _):
+        cursor = dbapi_conn.cursor()
+        for pragma in config.SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+    return engine
+
+
+class DbWriter(threading.Thread):
+    """从队列接收解析结果, 按批在单个事务中写入数据库"""
+
+    def __init__(
+        self,
+        stage,
+        url=None,
+        batch_rows=None,
+        on_completed=None,
+        on_error=None,
+        run_stats=None,
+    ):
+        super().__init__(daemon=True)
+        self.stage = stage
+        self.run_stats = run_stats
+        self.batch_rows = batch_rows or config.WRITE_BATCH_ROWS
+        self.on_completed = on_completed
+        self.on_error = on_error
+        self.engine = create_db_engine(url)
+        self.queue = queue.Queue(maxsize=config.WRITE_QUEUE_SIZE)
+        self.rows = 0
+        self.files = 0
+        self.mismatched = 0
+        self.write_time = 0.0
+
+    def put(self, summary, combined_df, total_df, entry):
+        self.queue.put((summary, combined_df, total_df, entry))
+
+    def close(self):
+        self.queue.put(_STOP)
+        self.join()
+        self.engine.dispose()
+        return self.stats()
+
+    def stats(self):
+        rate = self.rows / self.write_time if self.write_time else 0.0
+        return {
+            "files": self.files,
+            "rows": self.rows,
+            "seconds": self.write_time,
+            "rows_per_sec": rate,
+            "mismatched": self.mismatched,
+        }
+
+    def run(self):
+        batch = []
+        pending = 0
+        while True:
+            try:
+                # 队列空闲时立即提交已积累的批次
+                item = self.queue.get(timeout=0.5 if batch else None)
+            except queue.Empty:
+                self.flush(batch)
+                batch, pending = [], 0
+                continue
+            if item is _STOP:
+                break
+            batch.append(item)
+            pending += len(item[1])
+            if pending >= self.batch_rows:
+                self.flush(batch)
+                batch, pending = [], 0
+        self.flush(batch)
+
+    def flush(self, batch):
+        if not batch:
+            return
+        start = time.perf_counter()
+        try:
+            # 同一批中内容相同的文件, 测量值只写入一份
+            first = {}
+            for item in batch:
+                first.setdefault(item[3]["hash"], item[1])
+            combined_df = pd.concat(first.values(), ignore_index=True)
+            total_df = pd.concat([item[2] for item in batch], ignore_index=True)
+            parts = total_df[["number", "title"]].drop_duplicates("number")
+            with self.engine.begin() as conn:
+                # 变更文件的旧记录与新记录在同一事务中替换
+                for *_, entry in batch:
+                    manifest.replace(conn, self.stage, entry)
+                schema.upsert_parts(
+                    conn,
+                    [{"part": p, "name": t} for p, t in parts.itertuples(index=False)],
+                )
+                combined_df[schema.MEASUREMENT_COLUMNS].to_sql(
+                    name="measurement", con=conn, if_exists="append", index=False
+                )
+                total_df[schema.TOTAL_COLUMNS].to_sql(
+                    name="Total", con=conn, if_exists="append", index=False
+                )
+                # 本批零件的各阶段分析列一并更新
+                analytics.analyze(conn, parts["number"].tolist())
+                mismatched = analytics.cross_check(
+                    conn, total_df["file_hash"].tolist()
+                )
+        except Exception as e:
+            logging.error(f"数据库写入错误: {str(e)}")
+            for summary, *_ in batch:
+                if self.run_stats:
+                    self.run_stats.failed(summary[0])
+                if self.on_error:
+                    self.on_error(f"{summary[1]}: {str(e)}")
+            return
+        elapsed = time.perf_counter() - start
+        self.write_time += elapsed
+        self.rows += len(combined_df) + len(total_df)
+        self.files += len(batch)
+        self.mismatched += len(mismatched)
+        for row in mismatched:
+            logging.warning(
+                f"合格率与卡片不一致: {row.file} 计算 {row.conformance:.2%}/"
+                f"{row.value_conformance:.2%}, 卡片 {row.icmd:.2%}/{row.icmc:.2%}"
+            )
+        for summary, *_ in batch:
+            # 批次耗时按文件数均摊
+            if self.run_stats:
+                self.run_stats.written(summary[0], elapsed / len(batch))
+            if self.on_completed:
+                self.on_completed(summary)